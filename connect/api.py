@@ -5,6 +5,8 @@ and schema management.
 """
 import frappe
 
+from connect.utils import json
+from connect.utils.cache import cached
 from connect.utils.errors import ERROR_CODES, error, ok
 from connect.utils.logging import log_error
 
@@ -73,21 +75,7 @@ def refresh_schemas():
 def get_active_rules():
     """Get all active emission rules grouped by DocType."""
     try:
-        rules = frappe.get_all(
-            "Fineract Event Emission Rule",
-            filters={"enabled": 1},
-            fields=["rule_name", "source_doctype", "document_event", "command_type", "priority"],
-            order_by="source_doctype, priority",
-        )
-        # Group by doctype
-        grouped = {}
-        for rule in rules:
-            dt = rule.source_doctype
-            if dt not in grouped:
-                grouped[dt] = []
-            grouped[dt].append(rule)
-
-        return ok("Active rules", {"rules": grouped, "total": len(rules)})
+        return ok("Active rules", _query_active_rules())
     except Exception as exc:
         log_error("Get active rules failed", str(exc), exc=exc)
         return error("Failed to fetch rules", {"detail": str(exc)}, code=ERROR_CODES["APP_ERROR"])
@@ -95,22 +83,58 @@ def get_active_rules():
 
 @frappe.whitelist()
 def get_kafka_stats():
-    """Get Kafka log statistics."""
+    """Get Kafka log statistics.
+
+    Cached for a minute; the counts do not need to be real-time.
+    """
     try:
-        stats = frappe.db.sql(
-            """
-            SELECT
-                direction,
-                status,
-                COUNT(*) as count
-            FROM `tabFineract Kafka Log`
-            WHERE creation >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
-            GROUP BY direction, status
-            ORDER BY direction, status
-            """,
-            as_dict=True,
-        )
-        return ok("Kafka stats (last 24h)", {"stats": stats})
+        return ok("Kafka stats (last 24h)", {"stats": _query_kafka_stats()})
     except Exception as exc:
         log_error("Get Kafka stats failed", str(exc), exc=exc)
         return error("Failed to fetch stats", {"detail": str(exc)}, code=ERROR_CODES["APP_ERROR"])
+
+
+@cached("connect:active_rules", ttl=300)
+def _query_active_rules():
+    # Group in MariaDB: one row per DocType with its rules as a JSON array
+    rows = frappe.db.sql(
+        """
+        SELECT
+            source_doctype,
+            JSON_ARRAYAGG(
+                JSON_OBJECT(
+                    'rule_name', rule_name,
+                    'source_doctype', source_doctype,
+                    'document_event', document_event,
+                    'command_type', command_type,
+                    'priority', priority
+                )
+                ORDER BY priority
+            ) AS rules,
+            COUNT(*) AS count
+        FROM `tabFineract Event Emission Rule`
+        WHERE enabled = 1
+        GROUP BY source_doctype
+        ORDER BY source_doctype
+        """,
+        as_dict=True,
+    )
+    grouped = {row.source_doctype: json.loads(row.rules) for row in rows}
+    return {"rules": grouped, "total": sum(row.count for row in rows)}
+
+
+@cached("connect:kafka_stats", ttl=60)
+def _query_kafka_stats():
+    return frappe.db.sql(
+        """
+        SELECT
+            direction,
+            status,
+            COUNT(*) as count
+        FROM `tabFineract Kafka Log`
+        WHERE creation >= DATE_SUB(NOW(), INTERVAL 24 HOUR)
+        GROUP BY direction, status
+        ORDER BY direction, status
+        """,
+        as_dict=True,
+    )
@@ -12,8 +12,40 @@ from frappe.commands import get_site, pass_context
 @click.command("connect-consumer")
 @click.option("--site", help="Site name")
 @click.option("--max-messages", default=0, type=int, help="Stop after N messages (0=unlimited)")
+@click.option(
+    "--batch-size",
+    default=None,
+    type=int,
+    help="Messages fetched per consume() call (default: Max Poll Records setting, or 500)",
+)
+@click.option(
+    "--poll-timeout",
+    default=None,
+    type=float,
+    help="Seconds to wait for a batch (default: Poll Timeout setting, or 1.0)",
+)
+@click.option(
+    "--commit-every",
+    default=1,
+    type=click.IntRange(min=1),
+    help="Commit offsets once every N batches (default: 1)",
+)
+@click.option(
+    "--commit-interval",
+    default=5.0,
+    type=click.FloatRange(min=0),
+    help="Commit offsets at least every N seconds, even mid-way through --commit-every (0=off)",
+)
 @pass_context
-def connect_consumer(context, site=None, max_messages=0):
+def connect_consumer(
+    context,
+    site=None,
+    max_messages=0,
+    batch_size=None,
+    poll_timeout=None,
+    commit_every=1,
+    commit_interval=5.0,
+):
     """Start the Connect Kafka consumer.
 
     Long-running process that polls Kafka for business events
@@ -25,7 +57,14 @@ def connect_consumer(context, site=None, max_messages=0):
 
     from connect.services.consumer_service import start_consumer
 
-    start_consumer(site=site, max_messages=max_messages)
+    start_consumer(
+        site=site,
+        max_messages=max_messages,
+        batch_size=batch_size,
+        poll_timeout=poll_timeout,
+        commit_every=commit_every,
+        commit_interval=commit_interval,
+    )
 
 
 @click.command("connect-health")
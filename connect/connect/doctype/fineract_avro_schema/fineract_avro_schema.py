@@ -1,8 +1,12 @@
-import json
-
+import fastavro
 import frappe
 from frappe.model.document import Document
 
+from connect.utils import json
+
+# Parsed fastavro schemas by (site, Schema Registry id); ids are immutable in the registry.
+_PARSED_SCHEMAS: dict[tuple[str, int], dict] = {}
+
 
 class FineractAvroSchema(Document):
     """Local cache of Avro schemas from the Schema Registry (MariaDB layer)."""
@@ -19,14 +23,53 @@ class FineractAvroSchema(Document):
             except json.JSONDecodeError as e:
                 frappe.throw(f"Invalid JSON in schema definition: {e}")
 
-    def before_save(self):
-        if self.is_latest:
-            # Unmark other versions of the same schema as non-latest
+    def on_update(self):
+        self._forget_parsed_schema()
+
+        # Skip no-op saves; has_value_changed is also true for new documents
+        if self.is_latest and self.has_value_changed("is_latest"):
+            # Flip this version to latest and every other version off in one statement
             frappe.db.sql(
                 """
                 UPDATE `tabFineract Avro Schema`
-                SET is_latest = 0
-                WHERE schema_name = %s AND name != %s
+                SET is_latest = CASE WHEN name = %s THEN 1 ELSE 0 END
+                WHERE schema_name = %s
                 """,
-                (self.schema_name, self.name),
+                (self.name, self.schema_name),
             )
+
+    def on_trash(self):
+        self._forget_parsed_schema()
+
+    def _forget_parsed_schema(self):
+        from connect.services.schema_service import invalidate_schema_cache
+
+        invalidate_schema_cache(self.schema_name)
+        if self.schema_id:
+            _PARSED_SCHEMAS.pop((frappe.local.site, self.schema_id), None)
+
+
+def get_parsed_schema(schema_id: int, sr_service=None) -> dict:
+    """Return the fastavro-parsed schema for a Schema Registry id.
+
+    Parsed once per process: looked up in Fineract Avro Schema by schema_id,
+    falling back to the registry when `sr_service` is given.
+    """
+    key = (frappe.local.site, schema_id)
+    parsed = _PARSED_SCHEMAS.get(key)
+    if parsed is not None:
+        return parsed
+
+    schema_json = frappe.db.get_value("Fineract Avro Schema", {"schema_id": schema_id}, "schema_json")
+    if not schema_json and sr_service:
+        schema_json = sr_service.get_schema_by_id(schema_id)
+    if not schema_json:
+        frappe.throw(f"Avro schema not found for schema id {schema_id}")
+
+    parsed = fastavro.parse_schema(json.loads(schema_json))
+    _PARSED_SCHEMAS[key] = parsed
+    return parsed
+
+
+def on_doctype_update():
+    frappe.db.add_index("Fineract Avro Schema", ["schema_name", "is_latest"])
@@ -1,6 +1,12 @@
 import frappe
 from frappe.model.document import Document
 
+from connect.connect.doctype.fineract_kafka_settings.fineract_kafka_settings import (
+    FineractKafkaSettings,
+)
+from connect.services.producer_service import MATCHING_RULES_LOCAL_KEY
+from connect.utils.conditions import compile_condition
+
 
 class FineractEventEmissionRule(Document):
     """Defines when a Frappe DocType event should produce a Fineract command."""
@@ -12,7 +18,7 @@ class FineractEventEmissionRule(Document):
     def _validate_condition(self):
         if self.condition:
             try:
-                compile(self.condition, "<condition>", "eval")
+                compile_condition(self.condition)
             except SyntaxError as e:
                 frappe.throw(f"Invalid condition expression: {e}")
 
@@ -27,4 +33,7 @@ class FineractEventEmissionRule(Document):
         self._invalidate_active_doctypes_cache()
 
     def _invalidate_active_doctypes_cache(self):
-        frappe.cache().delete_value("fineract_active_doctypes")
+        FineractKafkaSettings.invalidate_active_doctypes()
+        frappe.cache.delete_value("connect:active_rules")
+        # Rules matched earlier in this request (see producer_service.get_matching_rules)
+        setattr(frappe.local, MATCHING_RULES_LOCAL_KEY, None)
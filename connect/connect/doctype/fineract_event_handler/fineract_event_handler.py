@@ -1,6 +1,18 @@
+import time
+
 import frappe
 from frappe.model.document import Document
 
+from connect.utils.conditions import compile_condition
+
+# Process-local handler lookups per site, including misses.
+# Maps site -> (expires_at, {business_event_type: handler doc or None}).
+_HANDLERS: dict[str, tuple[float, dict]] = {}
+
+# Seconds a process keeps its lookups; bounds staleness in the consumer
+# process, which does not see on_update of documents saved elsewhere.
+HANDLER_CACHE_TTL = 30
+
 
 class FineractEventHandler(Document):
     """Maps incoming Fineract Business Events to Frappe actions."""
@@ -9,10 +21,16 @@ class FineractEventHandler(Document):
         self._validate_condition()
         self._validate_actions()
 
+    def on_update(self):
+        clear_handler_cache()
+
+    def on_trash(self):
+        clear_handler_cache()
+
     def _validate_condition(self):
         if self.condition:
             try:
-                compile(self.condition, "<condition>", "eval")
+                compile_condition(self.condition)
             except SyntaxError as e:
                 frappe.throw(f"Invalid condition expression: {e}")
 
@@ -30,3 +48,33 @@ class FineractEventHandler(Document):
                 frappe.throw(
                     f"Row {action.idx}: Target DocType is required for {action.action_type} actions"
                 )
+
+
+def get_handler(event_type: str) -> "FineractEventHandler | None":
+    """Return the enabled handler for a business event type, with its actions.
+
+    Looked up once per event type and cached process-locally for
+    HANDLER_CACHE_TTL seconds. The returned document is shared: do not modify it.
+    """
+    site = frappe.local.site
+    now = time.monotonic()
+    entry = _HANDLERS.get(site)
+    if not entry or now >= entry[0]:
+        entry = _HANDLERS[site] = (now + HANDLER_CACHE_TTL, {})
+
+    handlers = entry[1]
+    if event_type not in handlers:
+        name = frappe.db.get_value(
+            "Fineract Event Handler", {"enabled": 1, "business_event_type": event_type}, "name"
+        )
+        handlers[event_type] = frappe.get_doc("Fineract Event Handler", name) if name else None
+    return handlers[event_type]
+
+
+def clear_handler_cache():
+    """Drop this process's handler lookups for the current site."""
+    _HANDLERS.pop(frappe.local.site, None)
+
+
+def on_doctype_update():
+    frappe.db.add_index("Fineract Event Handler", ["enabled", "business_event_type"])
@@ -2,6 +2,9 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import now_datetime
 
+from connect.utils.db import affected_rows
+from connect.utils.idempotency import COMPLETED_STATUSES
+
 
 class FineractKafkaLog(Document):
     """Audit log for every produced/consumed Kafka message.
@@ -23,25 +26,24 @@ class FineractKafkaLog(Document):
         source_docname: str = None,
         rule_name: str = None,
         payload_json: str = None,
+        message_key: str | None = None,
     ) -> "FineractKafkaLog":
         """Create a log entry for a produced message."""
-        log = frappe.get_doc(
-            {
-                "doctype": "Fineract Kafka Log",
-                "direction": "Produced",
-                "status": "Pending",
-                "idempotency_key": idempotency_key,
-                "command_type": command_type,
-                "topic": topic,
-                "tenant_id": tenant_id,
-                "source_doctype": source_doctype,
-                "source_docname": source_docname,
-                "rule_name": rule_name,
-                "payload_json": payload_json,
-            }
-        )
-        log.insert(ignore_permissions=True)
-        return log
+        return FineractKafkaLog.log_produced_bulk(
+            [
+                {
+                    "idempotency_key": idempotency_key,
+                    "command_type": command_type,
+                    "topic": topic,
+                    "tenant_id": tenant_id,
+                    "source_doctype": source_doctype,
+                    "source_docname": source_docname,
+                    "rule_name": rule_name,
+                    "payload_json": payload_json,
+                    "message_key": message_key,
+                }
+            ]
+        )[0]
 
     @staticmethod
     def log_consumed(
@@ -55,54 +57,193 @@ class FineractKafkaLog(Document):
         payload_json: str = None,
     ) -> "FineractKafkaLog":
         """Create a log entry for a consumed message."""
-        log = frappe.get_doc(
-            {
-                "doctype": "Fineract Kafka Log",
-                "direction": "Consumed",
-                "status": "Pending",
-                "idempotency_key": idempotency_key,
-                "event_type": event_type,
-                "topic": topic,
-                "partition": partition,
-                "offset": offset,
-                "tenant_id": tenant_id,
-                "handler_name": handler_name,
-                "payload_json": payload_json,
-            }
+        return FineractKafkaLog.log_consumed_bulk(
+            [
+                {
+                    "idempotency_key": idempotency_key,
+                    "event_type": event_type,
+                    "topic": topic,
+                    "partition": partition,
+                    "offset": offset,
+                    "tenant_id": tenant_id,
+                    "handler_name": handler_name,
+                    "payload_json": payload_json,
+                }
+            ]
+        )[0]
+
+    @staticmethod
+    def log_produced_bulk(rows: list[dict]) -> list["FineractKafkaLog"]:
+        """Create Pending log entries for several produced messages at once."""
+        return _insert_logs("Produced", rows)
+
+    @staticmethod
+    def log_consumed_bulk(rows: list[dict]) -> list["FineractKafkaLog"]:
+        """Create Pending log entries for several consumed messages at once."""
+        return _insert_logs("Consumed", rows)
+
+    def mark_delivered(self, partition: int = None, offset: int = None, **fields):
+        """Update log to Delivered status after successful Kafka produce.
+
+        Extra `fields` (e.g. payload_json) are written in the same UPDATE.
+        """
+        self._bulk_set(
+            status="Delivered",
+            processed_at=now_datetime(),
+            partition=partition,
+            offset=offset,
+            **fields,
         )
-        log.insert(ignore_permissions=True)
-        return log
-
-    def mark_delivered(self, partition: int = None, offset: int = None):
-        """Update log to Delivered status after successful Kafka produce."""
-        updates = {"status": "Delivered", "processed_at": now_datetime()}
-        if partition is not None:
-            updates["partition"] = partition
-        if offset is not None:
-            updates["offset"] = offset
-        for field, value in updates.items():
-            self.db_set(field, value, update_modified=False)
 
     def mark_processed(self):
         """Update log to Processed status after successful dispatch."""
-        self.db_set("status", "Processed", update_modified=False)
-        self.db_set("processed_at", now_datetime(), update_modified=False)
+        self._bulk_set(status="Processed", processed_at=now_datetime())
 
     def mark_failed(self, error_message: str, error_traceback: str = None):
         """Update log to Failed status with error details."""
-        self.db_set("status", "Failed", update_modified=False)
-        self.db_set("error_message", error_message, update_modified=False)
-        if error_traceback:
-            self.db_set("error_traceback", error_traceback, update_modified=False)
-        self.db_set("retry_count", (self.retry_count or 0) + 1, update_modified=False)
+        self._bulk_set(
+            increment_retry=True,
+            status="Failed",
+            error_message=error_message,
+            error_traceback=error_traceback,
+        )
 
     def mark_dead_letter(self, error_message: str):
         """Update log to Dead Letter status."""
-        self.db_set("status", "Dead Letter", update_modified=False)
-        self.db_set("error_message", error_message, update_modified=False)
+        self._bulk_set(status="Dead Letter", error_message=error_message)
 
     def mark_skipped(self, reason: str = None):
         """Update log to Skipped status (e.g., duplicate idempotency key)."""
-        self.db_set("status", "Skipped", update_modified=False)
-        if reason:
-            self.db_set("error_message", reason, update_modified=False)
+        self._bulk_set(status="Skipped", error_message=reason)
+
+    def is_completed(self) -> bool:
+        """Whether the stored row has already been delivered, processed or skipped."""
+        status = self.flags.get("stored_status") or frappe.db.get_value(
+            "Fineract Kafka Log", self.name, "status"
+        )
+        return status in COMPLETED_STATUSES
+
+    def _bulk_set(self, increment_retry: bool = False, **fields):
+        """Write several fields in a single UPDATE, without touching `modified`.
+
+        Fields whose value is None are left unchanged. When `increment_retry`
+        is set, retry_count is incremented in the same statement.
+        """
+        fields = {field: value for field, value in fields.items() if value is not None}
+        assignments = [f"`{field}` = %s" for field in fields]
+        if increment_retry:
+            assignments.append("`retry_count` = COALESCE(`retry_count`, 0) + 1")
+        if not assignments:
+            return
+
+        frappe.db.sql(
+            f"UPDATE `tabFineract Kafka Log` SET {', '.join(assignments)} WHERE name = %s",
+            (*fields.values(), self.name),
+        )
+
+        self.update(fields)
+        if increment_retry:
+            self.retry_count = (self.retry_count or 0) + 1
+
+
+def on_doctype_update():
+    # Serves the 24h GROUP BY direction, status in api.get_kafka_stats as an index range scan
+    frappe.db.add_index("Fineract Kafka Log", ["direction", "status", "creation"])
+    # Serves the chunked retention DELETE in jobs.cleanup
+    frappe.db.add_index("Fineract Kafka Log", ["status", "modified"])
+    # Serves the stale-Pending scans in jobs.cleanup
+    frappe.db.add_index("Fineract Kafka Log", ["status", "creation"])
+    # Serves the latest-per-direction lookups in correlation_service.auto_correlate_by_external_id
+    frappe.db.add_index("Fineract Kafka Log", ["direction", "external_id", "creation"])
+
+
+_LOG_FIELDS = (
+    "direction",
+    "status",
+    "idempotency_key",
+    "command_type",
+    "event_type",
+    "topic",
+    "partition",
+    "offset",
+    "tenant_id",
+    "source_doctype",
+    "source_docname",
+    "rule_name",
+    "handler_name",
+    "payload_json",
+    "message_key",
+)
+
+
+def _insert_logs(direction: str, rows: list[dict]) -> list[FineractKafkaLog]:
+    """Insert log rows with one multi-row INSERT, bypassing the document lifecycle.
+
+    These are audit rows, so controller hooks, permission checks and
+    versioning are pure overhead on the producer/consumer hot path. Rows are
+    named by their idempotency key, so a repeated key hits the primary key and
+    only refreshes `modified` on the existing row instead of failing. Retries
+    are counted where they are scheduled (jobs.cleanup), not here.
+
+    Returns unsaved documents carrying the row names, so callers can still use
+    the `mark_*` helpers on them. `flags.is_duplicate` tells whether the key
+    already existed, or appeared earlier in the same batch.
+    """
+    if not rows:
+        return []
+
+    timestamp = now_datetime()
+    user = frappe.session.user
+    fields = ("name", "creation", "modified", "owner", "modified_by", "docstatus", "idx", "retry_count", *_LOG_FIELDS)
+
+    docs = []
+    values = []
+    for row in rows:
+        data = {field: row.get(field) for field in _LOG_FIELDS}
+        data.update(direction=direction, status="Pending")
+        name = data["idempotency_key"]
+        values.extend((name, timestamp, timestamp, user, user, 0, 0, 0, *data.values()))
+        docs.append(
+            frappe.get_doc(
+                {
+                    "doctype": "Fineract Kafka Log",
+                    "name": name,
+                    "creation": timestamp,
+                    "modified": timestamp,
+                    "retry_count": 0,
+                    **data,
+                }
+            )
+        )
+
+    if len(docs) > 1:
+        # Affected-row counts are only per statement, so look up the batch's
+        # existing keys (and their status, for is_completed) up front
+        stored = dict(
+            frappe.db.sql(
+                "SELECT name, status FROM `tabFineract Kafka Log` WHERE name IN %s",
+                (tuple(doc.name for doc in docs),),
+            )
+        )
+        seen = set()
+        for doc in docs:
+            doc.flags.is_duplicate = doc.name in stored or doc.name in seen
+            if doc.name not in seen:
+                doc.flags.stored_status = stored.get(doc.name)
+            seen.add(doc.name)
+
+    row_placeholders = f"({', '.join(['%s'] * len(fields))})"
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabFineract Kafka Log` ({", ".join(f"`{field}`" for field in fields)})
+        VALUES {", ".join([row_placeholders] * len(rows))}
+        ON DUPLICATE KEY UPDATE
+            `modified` = VALUES(`modified`)
+        """,
+        values,
+    )
+
+    if len(docs) == 1:
+        # MariaDB reports 1 affected row for an insert and 2 for an update
+        docs[0].flags.is_duplicate = affected_rows() != 1
+    return docs
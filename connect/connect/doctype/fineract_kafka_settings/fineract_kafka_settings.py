@@ -1,6 +1,23 @@
+import time
+
 import frappe
 from frappe.model.document import Document
 
+# Process-local copy of the settings per site, checked before Redis.
+# Maps site -> (expires_at, settings).
+_SETTINGS_CACHE: dict[str, tuple[float, "FineractKafkaSettings"]] = {}
+
+# Process-local snapshot of DocTypes with active emission rules, per site.
+# Maps site -> (expires_at, doctypes).
+_ACTIVE_DOCTYPES: dict[str, tuple[float, frozenset]] = {}
+
+# Consumer options that are not configurable from the settings form.
+_CONSUMER_FIXED_CONFIG = {
+    "max.poll.interval.ms": 300000,
+    "enable.auto.commit": False,
+    "partition.assignment.strategy": "cooperative-sticky",
+}
+
 
 class FineractKafkaSettings(Document):
     """Singleton configuration for Kafka-Fineract integration.
@@ -11,6 +28,30 @@ class FineractKafkaSettings(Document):
     """
 
     CACHE_KEY = "fineract_kafka_settings"
+    ACTIVE_DOCTYPES_CACHE_KEY = "fineract_active_doctypes"
+    LOCAL_CACHE_TTL = 30
+
+    # (client config key, settings field, default when the field is empty)
+    _PRODUCER_SPEC = (
+        ("bootstrap.servers", "kafka_bootstrap_servers", None),
+        ("acks", "producer_acks", "all"),
+        ("retries", "producer_retries", 3),
+        ("linger.ms", "producer_linger_ms", 5),
+    )
+    _CONSUMER_SPEC = (
+        ("bootstrap.servers", "kafka_bootstrap_servers", None),
+        ("group.id", "consumer_group_id", "openerp-fineract-consumer"),
+        ("auto.offset.reset", "consumer_auto_offset_reset", "earliest"),
+        ("session.timeout.ms", "consumer_session_timeout_ms", 30000),
+    )
+
+    # Built on first use and kept on the (cached) instance; a saved change
+    # yields a new instance, so these never outlive the settings they came from.
+    _producer_config = None
+    _consumer_config = None
+    _admin_config = None
+    _schema_registry_config = None
+    _secrets = None
 
     def validate(self):
         if self.security_protocol in ("SASL_SSL", "SASL_PLAINTEXT"):
@@ -23,55 +64,93 @@ class FineractKafkaSettings(Document):
         self._invalidate_cache()
 
     def _invalidate_cache(self):
-        frappe.cache().delete_value(self.CACHE_KEY)
+        frappe.cache.delete_value(self.CACHE_KEY)
+        _SETTINGS_CACHE.pop(frappe.local.site, None)
+        self._producer_config = self._consumer_config = self._admin_config = None
+        self._schema_registry_config = None
+        self._secrets = None
 
     @staticmethod
     def get_settings() -> "FineractKafkaSettings":
-        """Get cached settings singleton."""
-        cached = frappe.cache().get_value(FineractKafkaSettings.CACHE_KEY)
-        if cached:
-            return cached
-        settings = frappe.get_single("Fineract Kafka Settings")
-        frappe.cache().set_value(
-            FineractKafkaSettings.CACHE_KEY, settings, expires_in_sec=300
-        )
+        """Get cached settings singleton.
+
+        Served from a process-local copy for LOCAL_CACHE_TTL seconds, then
+        from Redis, then from the database. Other worker processes pick up
+        a saved change once their local copy expires.
+        """
+        site = frappe.local.site
+        now = time.monotonic()
+        local = _SETTINGS_CACHE.get(site)
+        if local and now < local[0]:
+            return local[1]
+
+        settings = frappe.cache.get_value(FineractKafkaSettings.CACHE_KEY)
+        if not settings:
+            settings = frappe.get_single("Fineract Kafka Settings")
+            frappe.cache.set_value(
+                FineractKafkaSettings.CACHE_KEY, settings, expires_in_sec=300
+            )
+
+        _SETTINGS_CACHE[site] = (now + FineractKafkaSettings.LOCAL_CACHE_TTL, settings)
         return settings
 
     def get_producer_config(self) -> dict:
         """Build confluent-kafka Producer configuration dict."""
-        config = {
-            "bootstrap.servers": self.kafka_bootstrap_servers,
-            "acks": self.producer_acks or "all",
-            "retries": self.producer_retries or 3,
-            "linger.ms": self.producer_linger_ms or 5,
-            "enable.idempotence": bool(self.enable_idempotence),
-        }
-        self._apply_security_config(config)
-        return config
+        if self._producer_config is None:
+            self._producer_config = self._build_producer_config()
+        return dict(self._producer_config)
 
     def get_consumer_config(self) -> dict:
         """Build confluent-kafka Consumer configuration dict."""
-        config = {
-            "bootstrap.servers": self.kafka_bootstrap_servers,
-            "group.id": self.consumer_group_id or "openerp-fineract-consumer",
-            "auto.offset.reset": self.consumer_auto_offset_reset or "earliest",
-            "max.poll.interval.ms": 300000,
-            "session.timeout.ms": self.consumer_session_timeout_ms or 30000,
-            "enable.auto.commit": False,
-            "partition.assignment.strategy": "cooperative-sticky",
-        }
-        self._apply_security_config(config)
-        return config
+        if self._consumer_config is None:
+            self._consumer_config = self._build_consumer_config()
+        return dict(self._consumer_config)
+
+    def get_admin_config(self) -> dict:
+        """Build confluent-kafka AdminClient configuration dict."""
+        if self._admin_config is None:
+            config = {"bootstrap.servers": self.kafka_bootstrap_servers}
+            self._apply_security_config(config)
+            self._admin_config = config
+        return dict(self._admin_config)
 
     def get_schema_registry_config(self) -> dict:
         """Build Schema Registry client configuration dict."""
+        if self._schema_registry_config is None:
+            self._schema_registry_config = self._build_schema_registry_config()
+        return dict(self._schema_registry_config)
+
+    def _build_producer_config(self) -> dict:
+        config = self._config_from_spec(self._PRODUCER_SPEC)
+        config["enable.idempotence"] = bool(self.enable_idempotence)
+        self._apply_security_config(config)
+        return config
+
+    def _build_consumer_config(self) -> dict:
+        config = self._config_from_spec(self._CONSUMER_SPEC)
+        config.update(_CONSUMER_FIXED_CONFIG)
+        self._apply_security_config(config)
+        return config
+
+    def _config_from_spec(self, spec: tuple) -> dict:
+        return {key: getattr(self, fieldname) or default for key, fieldname, default in spec}
+
+    def _build_schema_registry_config(self) -> dict:
         config = {"url": self.schema_registry_url}
         if self.schema_registry_username and self.schema_registry_password:
             config["basic.auth.user.info"] = (
-                f"{self.schema_registry_username}:{self.get_password('schema_registry_password')}"
+                f"{self.schema_registry_username}:{self._get_secret('schema_registry_password')}"
             )
         return config
 
+    def _get_secret(self, fieldname: str) -> str:
+        """Decrypt a password field once per settings instance."""
+        if self._secrets is None:
+            self._secrets = {}
+        if fieldname not in self._secrets:
+            self._secrets[fieldname] = self.get_password(fieldname)
+        return self._secrets[fieldname]
+
     def _apply_security_config(self, config: dict):
         """Apply security protocol, SASL, and SSL settings to a config dict."""
         protocol = self.security_protocol or "PLAINTEXT"
@@ -80,7 +159,7 @@ class FineractKafkaSettings(Document):
         if "SASL" in protocol:
             config["sasl.mechanism"] = self.sasl_mechanism
             config["sasl.username"] = self.sasl_username
-            config["sasl.password"] = self.get_password("sasl_password")
+            config["sasl.password"] = self._get_secret("sasl_password")
 
         if "SSL" in protocol:
             if self.ssl_ca_location:
@@ -90,18 +169,38 @@ class FineractKafkaSettings(Document):
             if self.ssl_key_location:
                 config["ssl.key.location"] = self.ssl_key_location
 
-    def get_active_doctypes(self) -> set:
-        """Return cached set of DocTypes that have active emission rules."""
-        cache_key = "fineract_active_doctypes"
-        cached = frappe.cache().get_value(cache_key)
-        if cached is not None:
-            return set(cached)
-
-        doctypes = frappe.get_all(
-            "Fineract Event Emission Rule",
-            filters={"enabled": 1},
-            pluck="source_doctype",
-            distinct=True,
-        )
-        frappe.cache().set_value(cache_key, doctypes, expires_in_sec=60)
-        return set(doctypes)
+    @staticmethod
+    def get_active_doctypes() -> frozenset:
+        """Return the DocTypes that have active emission rules.
+
+        Checked on every document event, so it is served from a process-local
+        snapshot for LOCAL_CACHE_TTL seconds before falling back to Redis and
+        then the database.
+        """
+        site = frappe.local.site
+        now = time.monotonic()
+        local = _ACTIVE_DOCTYPES.get(site)
+        if local and now < local[0]:
+            return local[1]
+
+        doctypes = frappe.cache.get_value(FineractKafkaSettings.ACTIVE_DOCTYPES_CACHE_KEY)
+        if doctypes is None:
+            doctypes = frappe.get_all(
+                "Fineract Event Emission Rule",
+                filters={"enabled": 1},
+                pluck="source_doctype",
+                distinct=True,
+            )
+            frappe.cache.set_value(
+                FineractKafkaSettings.ACTIVE_DOCTYPES_CACHE_KEY, doctypes, expires_in_sec=60
+            )
+
+        snapshot = frozenset(doctypes)
+        _ACTIVE_DOCTYPES[site] = (now + FineractKafkaSettings.LOCAL_CACHE_TTL, snapshot)
+        return snapshot
+
+    @staticmethod
+    def invalidate_active_doctypes():
+        """Drop the cached active DocTypes after an emission rule changes."""
+        frappe.cache.delete_value(FineractKafkaSettings.ACTIVE_DOCTYPES_CACHE_KEY)
+        _ACTIVE_DOCTYPES.pop(frappe.local.site, None)
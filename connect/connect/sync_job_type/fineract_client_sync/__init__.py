@@ -5,6 +5,7 @@ with corresponding ERPNext entities (e.g., Customer).
 """
 import frappe
 
+from connect.utils.defaults import get_selling_default
 from connect.utils.logging import log_error, log_info
 
 
@@ -73,26 +74,16 @@ def _create_or_update_customer(external_id: str, payload: dict):
     full_name = display_name or f"{first_name} {last_name}".strip()
 
     if customer_name:
-        # Update existing
-        customer = frappe.get_doc("Customer", customer_name)
-        customer.customer_name = full_name
-        if payload.get("mobileNo"):
-            # Store mobile on linked contact if needed
-            pass
-        customer.flags.ignore_permissions = True
-        customer.save()
+        # Update existing: only the name changes, so skip the full document save
+        frappe.db.set_value("Customer", customer_name, {"customer_name": full_name}, update_modified=True)
         log_info("fineract_client_sync", f"Updated Customer {customer_name} from Fineract client {external_id}")
     else:
         # Create new
         customer = frappe.new_doc("Customer")
         customer.customer_name = full_name
         customer.customer_type = "Individual"
-        customer.customer_group = frappe.db.get_single_value(
-            "Selling Settings", "customer_group"
-        ) or "Individual"
-        customer.territory = frappe.db.get_single_value(
-            "Selling Settings", "territory"
-        ) or "All Territories"
+        customer.customer_group = get_selling_default("customer_group")
+        customer.territory = get_selling_default("territory")
         # Store external reference
         customer.fineract_client_id = external_id
         customer.flags.ignore_permissions = True
@@ -113,10 +104,7 @@ def _deactivate_customer(external_id: str, payload: dict):
         )
         return
 
-    customer = frappe.get_doc("Customer", customer_name)
-    customer.disabled = 1
-    customer.flags.ignore_permissions = True
-    customer.save()
+    frappe.db.set_value("Customer", customer_name, {"disabled": 1})
     log_info("fineract_client_sync", f"Disabled Customer {customer_name} (Fineract client {external_id})")
 
 
@@ -102,8 +102,9 @@ def _handle_loan_approved(loan_id: str, payload: dict):
         log_info("fineract_loan_sync", f"No Loan found for Fineract loan {loan_id}")
         return
 
-    loan = frappe.get_doc("Loan", loan_name)
-    if loan.docstatus == 0:
+    # Only load the full document when there is actually something to submit
+    if frappe.db.get_value("Loan", loan_name, "docstatus") == 0:
+        loan = frappe.get_doc("Loan", loan_name)
         # Submit the loan to mark it as approved
         loan.flags.ignore_permissions = True
         try:
@@ -120,12 +121,18 @@ def _handle_loan_disbursed(loan_id: str, payload: dict):
         log_info("fineract_loan_sync", f"No Loan found for Fineract loan {loan_id}")
         return
 
-    # Create a Loan Disbursement Entry or update loan status
-    loan = frappe.get_doc("Loan", loan_name)
-    loan.disbursement_date = payload.get("actualDisbursementDate")
-    loan.disbursed_amount = payload.get("principal", loan.loan_amount)
-    loan.flags.ignore_permissions = True
-    loan.save()
+    # Update the disbursement fields directly; no controller logic depends on them here
+    disbursed_amount = payload.get("principal")
+    if disbursed_amount is None:
+        disbursed_amount = frappe.db.get_value("Loan", loan_name, "loan_amount")
+    frappe.db.set_value(
+        "Loan",
+        loan_name,
+        {
+            "disbursement_date": payload.get("actualDisbursementDate"),
+            "disbursed_amount": disbursed_amount,
+        },
+    )
 
     log_info("fineract_loan_sync", f"Disbursed Loan {loan_name} (Fineract loan {loan_id})")
 
@@ -152,10 +159,7 @@ def _handle_loan_closed(loan_id: str, payload: dict):
         log_info("fineract_loan_sync", f"No Loan found for Fineract loan {loan_id}")
         return
 
-    loan = frappe.get_doc("Loan", loan_name)
-    loan.status = "Closed"
-    loan.flags.ignore_permissions = True
-    loan.save()
+    frappe.db.set_value("Loan", loan_name, "status", "Closed")
 
     log_info("fineract_loan_sync", f"Closed Loan {loan_name} (Fineract loan {loan_id})")
 
@@ -141,7 +141,10 @@ doc_events = {
         "on_submit": "connect.services.producer_service.on_document_event",
         "on_cancel": "connect.services.producer_service.on_document_event",
         "on_trash": "connect.services.producer_service.on_document_event",
-    }
+    },
+    "Selling Settings": {
+        "on_update": "connect.utils.defaults.clear_selling_defaults",
+    },
 }
 
 # Scheduled Tasks
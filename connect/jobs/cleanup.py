@@ -1,10 +1,17 @@
 """Scheduled cleanup job: purge old Kafka logs and stale pending entries."""
 
 import frappe
-from frappe.utils import add_days, now_datetime
+from frappe.utils import add_days, add_to_date, now_datetime
 
+from connect.services.producer_service import enqueue_produce
+from connect.utils.db import affected_rows
 from connect.utils.logging import log_error, log_info
 
+# Rows touched per DELETE/UPDATE statement, and statements per job run. Keeps
+# each transaction short; anything left over is picked up by the next run.
+CLEANUP_BATCH_SIZE = 10000
+CLEANUP_MAX_BATCHES = 100
+
 
 def cleanup_kafka_logs():
 	"""Scheduled job: delete Kafka log entries older than retention period.
@@ -20,84 +27,115 @@ def cleanup_kafka_logs():
 		cutoff = add_days(now_datetime(), -retention_days)
 
 		# Delete old logs beyond retention
-		deleted = frappe.db.delete(
-			"Fineract Kafka Log",
-			{
-				"creation": ("<", cutoff),
-				"status": ("in", ["Delivered", "Processed", "Skipped", "Dead Letter"]),
-			},
+		deleted = _run_in_batches(
+			"""
+			DELETE FROM `tabFineract Kafka Log`
+			WHERE status IN ('Delivered', 'Processed', 'Skipped', 'Dead Letter')
+			AND modified < %s
+			ORDER BY modified
+			LIMIT %s
+			""",
+			(cutoff,),
 		)
 		if deleted:
 			log_info("Kafka log cleanup", f"Deleted {deleted} old log entries")
 
-		# Handle stale Pending entries (older than 10 minutes)
-		stale_cutoff = add_days(now_datetime(), 0)  # Will use minutes below
+		# Handle stale Pending entries (older than 10 minutes). The cutoff is
+		# computed here so the predicates stay sargable on (status, creation).
+		max_retries = settings.max_produce_retries or 5
+		stale_cutoff = add_to_date(now_datetime(), minutes=-10)
 		stale_logs = frappe.db.sql(
 			"""
-            SELECT name, direction, command_type, source_doctype, source_docname, rule_name, idempotency_key, retry_count
-            FROM `tabFineract Kafka Log`
-            WHERE status = 'Pending'
-            AND TIMESTAMPDIFF(MINUTE, creation, NOW()) > 10
-            AND retry_count < %s
-            """,
-			(settings.max_produce_retries or 5,),
+			SELECT name, direction, command_type, source_doctype, source_docname, rule_name, idempotency_key, retry_count
+			FROM `tabFineract Kafka Log`
+			WHERE status = 'Pending'
+			AND creation < %s
+			AND retry_count < %s
+			""",
+			(stale_cutoff, max_retries),
 			as_dict=True,
 		)
 
+		to_retry = []
+		to_fail = []
 		for log_entry in stale_logs:
 			if log_entry.direction == "Produced" and log_entry.rule_name:
-				# Re-enqueue the produce job
-				try:
-					frappe.enqueue(
-						"connect.background_jobs.produce_message.produce_fineract_command",
-						queue="default",
-						timeout=120,
-						doctype=log_entry.source_doctype,
-						docname=log_entry.source_docname,
-						rule_name=log_entry.rule_name,
-						idempotency_key=log_entry.idempotency_key,
-					)
-					frappe.db.set_value(
-						"Fineract Kafka Log",
-						log_entry.name,
-						"retry_count",
-						(log_entry.retry_count or 0) + 1,
-						update_modified=False,
-					)
-					log_info("Stale log re-enqueued", f"name={log_entry.name}")
-				except Exception as e:
-					log_error("Failed to re-enqueue stale log", str(e), exc=e)
+				to_retry.append(log_entry)
 			else:
 				# Mark as Failed if can't retry
-				frappe.db.set_value(
-					"Fineract Kafka Log",
-					log_entry.name,
-					"status",
-					"Failed",
-					update_modified=False,
-				)
-				frappe.db.set_value(
-					"Fineract Kafka Log",
-					log_entry.name,
-					"error_message",
-					"Stale Pending entry marked as Failed",
-					update_modified=False,
+				to_fail.append(log_entry.name)
+
+		# enqueue_produce defers the Redis push to commit, so the jobs go out
+		# together with the retry_count bump and this loop does no DB writes
+		retried = []
+		for log_entry in to_retry:
+			try:
+				enqueue_produce(
+					log_entry.source_doctype,
+					log_entry.source_docname,
+					log_entry.rule_name,
+					log_entry.idempotency_key,
 				)
+				retried.append(log_entry.name)
+			except Exception as e:
+				log_error("Failed to re-enqueue stale log", str(e), exc=e)
+
+		if retried or to_fail:
+			# Retry bookkeeping and stale failures in a single statement
+			frappe.db.sql(
+				"""
+				UPDATE `tabFineract Kafka Log`
+				SET retry_count = CASE WHEN name IN %(retried)s THEN retry_count + 1 ELSE retry_count END,
+					status = CASE WHEN name IN %(failed)s THEN 'Failed' ELSE status END,
+					error_message = CASE
+						WHEN name IN %(failed)s THEN 'Stale Pending entry marked as Failed'
+						ELSE error_message
+					END
+				WHERE name IN %(names)s
+				""",
+				{
+					# IN () is invalid SQL, so an empty bucket matches a name that cannot exist
+					"retried": tuple(retried) or ("",),
+					"failed": tuple(to_fail) or ("",),
+					"names": tuple(retried + to_fail),
+				},
+			)
+		if retried:
+			log_info("Stale logs re-enqueued", f"count={len(retried)}")
 
 		# Mark as Failed: entries that exceeded max retries
-		frappe.db.sql(
+		_run_in_batches(
 			"""
-            UPDATE `tabFineract Kafka Log`
-            SET status = 'Failed',
-                error_message = 'Exceeded max retries'
-            WHERE status = 'Pending'
-            AND TIMESTAMPDIFF(MINUTE, creation, NOW()) > 10
-            AND retry_count >= %s
-            """,
-			(settings.max_produce_retries or 5,),
+			UPDATE `tabFineract Kafka Log`
+			SET status = 'Failed',
+				error_message = 'Exceeded max retries'
+			WHERE status = 'Pending'
+			AND creation < %s
+			AND retry_count >= %s
+			ORDER BY creation
+			LIMIT %s
+			""",
+			(stale_cutoff, max_retries),
 		)
 
 		frappe.db.commit()
 
 	except Exception as e:
 		log_error("Kafka log cleanup failed", str(e), exc=e)
+
+
+def _run_in_batches(query: str, values: tuple) -> int:
+	"""Run a DELETE/UPDATE ending in `LIMIT %s` repeatedly until it runs dry.
+
+	Commits after every statement and stops after CLEANUP_MAX_BATCHES.
+	Returns the total number of affected rows.
+	"""
+	total = 0
+	for _ in range(CLEANUP_MAX_BATCHES):
+		frappe.db.sql(query, (*values, CLEANUP_BATCH_SIZE))
+		affected = affected_rows()
+		frappe.db.commit()
+		total += affected
+		if affected < CLEANUP_BATCH_SIZE:
+			break
+	return total
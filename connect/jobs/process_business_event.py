@@ -1,9 +1,10 @@
 """Background job: process a consumed Fineract business event."""
 
-import json
+from functools import lru_cache
 
 import frappe
 
+from connect.utils import json
 from connect.utils.logging import log_error, log_info
 
 
@@ -13,31 +14,32 @@ def process_document_action(
 	field_mapping_json: str | None,
 	correlation_field: str | None,
 	payload: dict,
+	direct_update: bool = False,
 ):
 	"""Process a Create/Update Document action from a consumed event.
 
+	Runs as a background job: the job runner commits once when it returns
+	and rolls back if it raises, so the helpers below do not commit.
+
 	Args:
 		action_type: 'Create Document' or 'Update Document'.
 		target_doctype: The DocType to create/update.
 		field_mapping_json: JSON string mapping payload fields → DocType fields.
 		correlation_field: Payload field used for matching (e.g., 'externalId').
 		payload: The deserialized inner Avro payload dict.
+		direct_update: For updates, write the values with `frappe.db.set_value`
+			instead of loading and saving the document through its controller.
 	"""
 	try:
-		# Parse field mappings
-		field_map = {}
-		if field_mapping_json:
-			field_map = json.loads(field_mapping_json)
-
-		# Build values dict from payload using field mappings
+		# Build values dict from payload using the (cached) compiled field mappings
 		values = {}
-		for target_field, source_path in field_map.items():
-			values[target_field] = _resolve_path(payload, source_path)
+		for target_field, parts in _compile_mapping(field_mapping_json):
+			values[target_field] = _resolve_parts(payload, parts)
 
 		if action_type == "Create Document":
 			_create_document(target_doctype, values)
 		elif action_type == "Update Document":
-			_update_document(target_doctype, values, correlation_field, payload)
+			_update_document(target_doctype, values, correlation_field, payload, direct_update)
 
 	except Exception as e:
 		log_error(
@@ -48,9 +50,22 @@ def process_document_action(
 		raise
 
 
+@lru_cache(maxsize=1024)
+def _compile_mapping(field_mapping_json: str | None) -> tuple[tuple[str, tuple[str, ...]], ...]:
+	"""Parse a field mapping JSON once into (target_field, source path parts) pairs."""
+	if not field_mapping_json:
+		return ()
+	field_map = json.loads(field_mapping_json)
+	return tuple((target_field, tuple(source_path.split("."))) for target_field, source_path in field_map.items())
+
+
 def _resolve_path(data: dict, path: str):
 	"""Resolve a dotted path in a dict. E.g., 'client.name' → data['client']['name']."""
-	parts = path.split(".")
+	return _resolve_parts(data, tuple(path.split(".")))
+
+
+def _resolve_parts(data: dict, parts: tuple[str, ...]):
+	"""Resolve pre-split path parts in a dict."""
 	current = data
 	for part in parts:
 		if isinstance(current, dict):
@@ -64,7 +79,6 @@ def _create_document(doctype: str, values: dict):
 	"""Create a new Frappe document."""
 	doc = frappe.get_doc({"doctype": doctype, **values})
 	doc.insert(ignore_permissions=True)
-	frappe.db.commit()
 	log_info("Document created", f"doctype={doctype}, name={doc.name}")
 
 
@@ -73,8 +87,13 @@ def _update_document(
 	values: dict,
 	correlation_field: str | None,
 	payload: dict,
+	direct_update: bool = False,
 ):
-	"""Find and update an existing document using correlation field."""
+	"""Find and update an existing document using correlation field.
+
+	With `direct_update`, the values are written in a single UPDATE without
+	running validations, hooks or version tracking.
+	"""
 	if not correlation_field:
 		log_error("Update document: no correlation field", f"doctype={doctype}")
 		return
@@ -101,9 +120,12 @@ def _update_document(
 		)
 		return
 
-	doc = frappe.get_doc(doctype, existing)
-	for field, value in values.items():
-		doc.set(field, value)
-	doc.save(ignore_permissions=True)
-	frappe.db.commit()
-	log_info("Document updated", f"doctype={doctype}, name={doc.name}")
+	if direct_update:
+		if values:
+			frappe.db.set_value(doctype, existing, values)
+	else:
+		doc = frappe.get_doc(doctype, existing)
+		for field, value in values.items():
+			doc.set(field, value)
+		doc.save(ignore_permissions=True)
+	log_info("Document updated", f"doctype={doctype}, name={existing}")
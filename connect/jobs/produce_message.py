@@ -17,6 +17,22 @@ def produce_fineract_command(
 	Called via frappe.enqueue() with enqueue_after_commit=True from
 	the producer_service.on_document_event() handler.
 	"""
+	produce_fineract_commands(doctype, docname, [(rule_name, idempotency_key)])
+
+
+def produce_fineract_commands(
+	doctype: str,
+	docname: str,
+	rules: list,
+):
+	"""RQ job entry point: produce the messages of several rules for one document.
+
+	Enqueued once per document event when more than one rule matches, so the
+	document is loaded once and a single job is pushed.
+
+	Args:
+		rules: List of (rule_name, idempotency_key) pairs, in rule priority order.
+	"""
 	try:
 		doc = frappe.get_doc(doctype, docname)
 	except frappe.DoesNotExistError:
@@ -29,16 +45,22 @@ def produce_fineract_command(
 		log_error("Produce job: failed to load document", str(e), exc=e)
 		raise
 
-	try:
-		produce_message(
-			doc=doc,
-			rule_name=rule_name,
-			idempotency_key=idempotency_key,
-		)
-	except Exception as e:
-		log_error(
-			"Produce job failed",
-			f"doctype={doctype}, name={docname}, rule={rule_name}, error={e}",
-			exc=e,
-		)
-		raise
+	first_error = None
+	for rule_name, idempotency_key in rules:
+		try:
+			produce_message(
+				doc=doc,
+				rule_name=rule_name,
+				idempotency_key=idempotency_key,
+			)
+		except Exception as e:
+			# Each rule has its own log row; carry on with the remaining rules
+			log_error(
+				"Produce job failed",
+				f"doctype={doctype}, name={docname}, rule={rule_name}, error={e}",
+				exc=e,
+			)
+			first_error = first_error or e
+
+	if first_error:
+		raise first_error
@@ -4,6 +4,7 @@ import time
 
 import frappe
 
+from connect.utils import metrics
 from connect.utils.logging import log_error, log_info
 
 
@@ -16,56 +17,155 @@ class KafkaConsumerClient:
         self._consumer = Consumer(config)
         self._topics = topics
         self._running = False
-
-    def start(self, message_handler, poll_timeout: float = 1.0, max_messages: int = 0):
-        """Start the consumer poll loop.
+        # (topic, partition) -> next offset to commit
+        self._pending_offsets: dict[tuple[str, int], int] = {}
+
+    def start(
+        self,
+        message_handler=None,
+        poll_timeout: float = 1.0,
+        max_messages: int = 0,
+        batch_size: int = 500,
+        commit_every: int = 1,
+        commit_interval: float = 5.0,
+        batch_handler=None,
+    ):
+        """Start the consumer loop.
+
+        Messages are fetched in batches with `consume()`. The next offset of
+        each handled (topic, partition) is tracked and committed asynchronously
+        every `commit_every` batches, or once `commit_interval` seconds have
+        passed since the last commit, whichever comes first; whatever is still
+        pending is committed synchronously on shutdown and when partitions
+        are revoked by a rebalance.
 
         Args:
             message_handler: Callable(msg) -> None. Called for each message.
-            poll_timeout: Seconds to wait for messages in each poll.
+            poll_timeout: Seconds to wait for a batch in each consume call.
             max_messages: Stop after N messages (0 = unlimited).
+            batch_size: Maximum number of messages returned per consume call.
+            commit_every: Number of batches between offset commits.
+            commit_interval: Maximum seconds between offset commits (0 = no limit).
+            batch_handler: Callable(msgs) -> None. Called once per consumed batch
+                with its non-error messages, instead of `message_handler`. If it
+                raises, no offset of the batch is recorded and each partition is
+                rewound to the batch's first offset, so the batch is delivered again.
         """
         self._running = True
         self._setup_signal_handlers()
-        self._consumer.subscribe(self._topics)
+        self._consumer.subscribe(self._topics, on_revoke=self._on_revoke)
 
-        log_info("Consumer started", f"topics={self._topics}")
+        log_info("Consumer started", f"topics={self._topics} batch_size={batch_size}")
         message_count = 0
+        batches_since_commit = 0
+        last_commit = time.monotonic()
 
         try:
             while self._running:
-                msg = self._consumer.poll(timeout=poll_timeout)
-
-                if msg is None:
-                    continue
-
-                if msg.error():
-                    self._handle_error(msg)
+                num_messages = batch_size
+                if max_messages > 0:
+                    # Never fetch past the limit, so every fetched message is handled
+                    num_messages = min(batch_size, max_messages - message_count)
+
+                msgs = self._consumer.consume(num_messages=num_messages, timeout=poll_timeout)
+                if not msgs:
+                    # Idle: flush offsets held back by commit_every
+                    if commit_interval and time.monotonic() - last_commit >= commit_interval:
+                        self._commit_pending(asynchronous=True)
+                        batches_since_commit = 0
+                        last_commit = time.monotonic()
                     continue
 
-                try:
-                    message_handler(msg)
-                    self._consumer.commit(message=msg)
-                    message_count += 1
-
-                    if max_messages > 0 and message_count >= max_messages:
-                        log_info("Consumer max messages reached", f"count={message_count}")
-                        break
-
-                except Exception as e:
-                    log_error(
-                        "Consumer message processing failed",
-                        str(e),
-                        exc=e,
-                    )
-                    # Commit offset to move past the problematic message
-                    self._consumer.commit(message=msg)
+                valid = []
+                for msg in msgs:
+                    if msg.error():
+                        self._handle_error(msg)
+                        continue
+                    valid.append(msg)
+
+                if batch_handler:
+                    if valid:
+                        try:
+                            batch_handler(valid)
+                        except Exception as e:
+                            # The batch was rolled back as a whole: deliver it again
+                            log_error("Consumer batch processing failed", str(e), exc=e)
+                            self._rewind(valid)
+                            continue
+                else:
+                    for msg in valid:
+                        try:
+                            message_handler(msg)
+                        except Exception as e:
+                            log_error(
+                                "Consumer message processing failed",
+                                str(e),
+                                exc=e,
+                            )
+
+                # Offsets are committed even for messages whose handler failed, to
+                # move past them; a failed batch never gets here
+                for msg in valid:
+                    self._pending_offsets[(msg.topic(), msg.partition())] = msg.offset() + 1
+
+                handled = len(valid)
+                if handled:
+                    message_count += handled
+                    batches_since_commit += 1
+                    now = time.monotonic()
+                    if batches_since_commit >= commit_every or (
+                        commit_interval and now - last_commit >= commit_interval
+                    ):
+                        self._commit_pending(asynchronous=True)
+                        batches_since_commit = 0
+                        last_commit = now
+
+                if max_messages > 0 and message_count >= max_messages:
+                    log_info("Consumer max messages reached", f"count={message_count}")
+                    break
 
         except Exception as e:
             log_error("Consumer loop error", str(e), exc=e)
         finally:
             self._shutdown()
 
+    def _commit_pending(self, asynchronous: bool):
+        """Commit the highest handled offset per partition, if any."""
+        if not self._pending_offsets:
+            return
+
+        from confluent_kafka import TopicPartition
+
+        offsets = [
+            TopicPartition(topic, partition, offset)
+            for (topic, partition), offset in self._pending_offsets.items()
+        ]
+        self._pending_offsets.clear()
+        self._consumer.commit(offsets=offsets, asynchronous=asynchronous)
+
+    def _rewind(self, msgs: list):
+        """Seek each partition of a batch back to its first offset."""
+        from confluent_kafka import TopicPartition
+
+        first_offsets: dict[tuple[str, int], int] = {}
+        for msg in msgs:
+            key = (msg.topic(), msg.partition())
+            first_offsets[key] = min(first_offsets.get(key, msg.offset()), msg.offset())
+
+        for (topic, partition), offset in first_offsets.items():
+            try:
+                self._consumer.seek(TopicPartition(topic, partition, offset))
+            except Exception as e:
+                # Partition no longer assigned: its new owner resumes from the last commit
+                log_error("Consumer seek error", f"{topic}[{partition}]@{offset}: {e}", exc=e)
+
+    def _on_revoke(self, consumer, partitions):
+        """Commit held-back offsets before partitions move to another consumer."""
+        try:
+            self._commit_pending(asynchronous=False)
+        except Exception as e:
+            log_error("Consumer revoke commit error", str(e), exc=e)
+
     def _handle_error(self, msg):
         """Handle Kafka consumer errors."""
         from confluent_kafka import KafkaError
@@ -89,6 +189,11 @@ class KafkaConsumerClient:
     def _shutdown(self):
         """Clean shutdown of the consumer."""
         log_info("Consumer shutting down", "closing consumer")
+        metrics.flush()
+        try:
+            self._commit_pending(asynchronous=False)
+        except Exception as e:
+            log_error("Consumer final commit error", str(e), exc=e)
         try:
             self._consumer.close()
         except Exception as e:
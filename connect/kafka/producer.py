@@ -1,7 +1,12 @@
 """Kafka Producer client wrapper."""
+import time
+from concurrent.futures import Future
+from functools import lru_cache
+
 import frappe
 
-from connect.utils.logging import log_error, log_info
+from connect.utils import metrics
+from connect.utils.logging import log_error
 
 
 class KafkaProducerClient:
@@ -11,56 +16,91 @@ class KafkaProducerClient:
         from confluent_kafka import Producer
 
         self._producer = Producer(config)
-        self._delivery_result = None
 
     def produce(
         self,
         topic: str,
         value: bytes,
         key: str | None = None,
-        headers: dict | None = None,
+        headers: dict | list[tuple[str, bytes]] | None = None,
+        timeout: float = 30,
     ) -> dict | None:
-        """Produce a message to Kafka and flush.
+        """Produce a message to Kafka and wait for its delivery report.
+
+        Only this message is waited for; other in-flight messages keep
+        batching in librdkafka instead of being flushed.
 
         Returns delivery metadata dict with partition/offset on success,
         or raises an exception on failure.
         """
-        self._delivery_result = None
+        future = self.produce_async(topic=topic, value=value, key=key, headers=headers)
+
+        deadline = time.monotonic() + timeout
+        while not future.done():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise Exception(f"Kafka delivery timed out after {timeout}s")
+            self._producer.poll(remaining)
+
+        return future.result()
+
+    def produce_async(
+        self,
+        topic: str,
+        value: bytes,
+        key: str | None = None,
+        headers: dict | list[tuple[str, bytes]] | None = None,
+    ) -> Future:
+        """Queue a message for delivery and return a future for its delivery report.
 
-        kafka_headers = []
-        if headers:
-            kafka_headers = [(k, v.encode() if isinstance(v, str) else v) for k, v in headers.items()]
+        The future resolves from a later `poll()`/`flush()` with the delivery
+        metadata dict, or with an exception if delivery failed. Each message
+        gets its own future, so several deliveries can be in flight at once:
+
+            futures = [client.produce_async(topic, v) for v in values]
+            client.flush()
+            results = [f.result() for f in futures]
+
+        `headers` may be a dict (str values are UTF-8 encoded, cached per
+        distinct set of headers) or an already encoded list of (key, bytes),
+        which is passed through untouched.
+        """
+        if isinstance(headers, dict):
+            headers = encode_headers(headers) if headers else None
+        future = Future()
 
-        self._producer.produce(
+        def _on_delivery(err, msg):
+            if err:
+                log_error("Kafka delivery failed", str(err))
+                future.set_exception(Exception(f"Kafka delivery failed: {err}"))
+                return
+            metrics.inc("kafka.delivered", topic=msg.topic())
+            future.set_result(
+                {
+                    "topic": msg.topic(),
+                    "partition": msg.partition(),
+                    "offset": msg.offset(),
+                    "key": msg.key().decode() if msg.key() else None,
+                }
+            )
+
+        kwargs = dict(
             topic=topic,
             key=key,
             value=value,
-            headers=kafka_headers or None,
-            on_delivery=self._on_delivery,
+            headers=headers,
+            on_delivery=_on_delivery,
         )
-        self._producer.flush(timeout=30)
-
-        if self._delivery_result and self._delivery_result.get("error"):
-            raise Exception(f"Kafka delivery failed: {self._delivery_result['error']}")
-
-        return self._delivery_result
-
-    def _on_delivery(self, err, msg):
-        """Callback for delivery confirmation."""
-        if err:
-            self._delivery_result = {"error": str(err)}
-            log_error("Kafka delivery failed", str(err))
-        else:
-            self._delivery_result = {
-                "topic": msg.topic(),
-                "partition": msg.partition(),
-                "offset": msg.offset(),
-                "key": msg.key().decode() if msg.key() else None,
-            }
-            log_info(
-                "Kafka message delivered",
-                f"topic={msg.topic()} partition={msg.partition()} offset={msg.offset()}",
-            )
+        try:
+            self._producer.produce(**kwargs)
+        except BufferError:
+            # Local queue is full: serve delivery reports to make room, then retry once
+            self._producer.poll(1)
+            self._producer.produce(**kwargs)
+
+        # Serve callbacks of earlier messages without blocking
+        self._producer.poll(0)
+        return future
 
     def flush(self, timeout: float = 30):
         """Flush pending messages."""
@@ -69,3 +109,26 @@ class KafkaProducerClient:
     def close(self):
         """Flush and close the producer."""
         self._producer.flush(timeout=10)
+        metrics.flush()
+
+
+def encode_headers(headers: dict) -> list[tuple[str, bytes]]:
+    """Encode a header dict to librdkafka's list of (key, bytes) form.
+
+    Header sets built from rule/settings values repeat for every message, so
+    the encoded form is cached. The returned list is shared: do not mutate it.
+    """
+    try:
+        return _encode_header_items(tuple(headers.items()))
+    except TypeError:
+        # Unhashable header values; encode without caching
+        return _encode_items(headers.items())
+
+
+@lru_cache(maxsize=256)
+def _encode_header_items(items: tuple) -> list[tuple[str, bytes]]:
+    return _encode_items(items)
+
+
+def _encode_items(items) -> list[tuple[str, bytes]]:
+    return [(k, v.encode() if isinstance(v, str) else v) for k, v in items]
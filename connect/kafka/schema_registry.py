@@ -1,19 +1,31 @@
 """Schema Registry client wrapper with three-layer caching."""
-import json
+import time
 from datetime import datetime
 
 import frappe
 
 from connect.utils.logging import log_error, log_info
 
+# Process-local lookups, keyed by registry URL so services built from the
+# same settings share them. Latest versions expire; schema ids are immutable.
+_LATEST_CACHE: dict[tuple[str, str], tuple[dict, float]] = {}
+_BY_ID_CACHE: dict[tuple[str, int], str] = {}
+_SUBJECT_SCHEMA_ID_CACHE: dict[tuple[str, str, str], int] = {}
+
+# Services per config fingerprint, shared by every caller in the process
+_SERVICE_POOL: dict[tuple, "SchemaRegistryService"] = {}
+
 
 class SchemaRegistryService:
     """Wraps the Confluent Schema Registry client with caching."""
 
+    LATEST_TTL = 300
+
     def __init__(self, config: dict):
         from confluent_kafka.schema_registry import SchemaRegistryClient
 
         self._client = SchemaRegistryClient(config)
+        self._url = config.get("url")
 
     @property
     def client(self):
@@ -23,23 +35,37 @@ class SchemaRegistryService:
         """Fetch the latest schema for a subject from the registry.
 
         Returns dict with keys: schema_str, schema_id, version, subject.
+        Served from a process-local copy for LATEST_TTL seconds.
         """
+        now = time.monotonic()
+        cached = _LATEST_CACHE.get((self._url, subject))
+        if cached and cached[1] > now:
+            return cached[0]
+
         try:
             registered = self._client.get_latest_version(subject)
-            return {
+            result = {
                 "schema_str": registered.schema.schema_str,
                 "schema_id": registered.schema_id,
                 "version": registered.version,
                 "subject": subject,
             }
+            _LATEST_CACHE[(self._url, subject)] = (result, now + self.LATEST_TTL)
+            _BY_ID_CACHE[(self._url, registered.schema_id)] = registered.schema.schema_str
+            return result
         except Exception as e:
             log_error("Schema Registry fetch failed", str(e), exc=e)
             raise
 
     def get_schema_by_id(self, schema_id: int) -> str:
-        """Fetch a schema string by its numeric ID."""
+        """Fetch a schema string by its numeric ID (cached; ids never change)."""
+        cached = _BY_ID_CACHE.get((self._url, schema_id))
+        if cached is not None:
+            return cached
+
         try:
             schema = self._client.get_schema(schema_id)
+            _BY_ID_CACHE[(self._url, schema_id)] = schema.schema_str
             return schema.schema_str
         except Exception as e:
             log_error(f"Schema Registry fetch by ID {schema_id} failed", str(e), exc=e)
@@ -52,8 +78,47 @@ class SchemaRegistryService:
         try:
             schema = Schema(schema_str, "AVRO")
             schema_id = self._client.register_schema(subject, schema)
+            _LATEST_CACHE.pop((self._url, subject), None)
             log_info("Schema registered", f"subject={subject}, schema_id={schema_id}")
             return schema_id
         except Exception as e:
             log_error("Schema registration failed", str(e), exc=e)
             raise
+
+    def get_schema_id(self, subject: str, schema_str: str, auto_register: bool = True) -> int:
+        """Return the id of `schema_str` under `subject`, cached per process.
+
+        Registers the schema when `auto_register` is set (a no-op returning the
+        existing id if it is already registered), otherwise looks it up.
+        """
+        key = (self._url, subject, schema_str)
+        schema_id = _SUBJECT_SCHEMA_ID_CACHE.get(key)
+        if schema_id is not None:
+            return schema_id
+
+        if auto_register:
+            schema_id = self.register_schema(subject, schema_str)
+        else:
+            from confluent_kafka.schema_registry import Schema
+
+            try:
+                schema_id = self._client.lookup_schema(subject, Schema(schema_str, "AVRO")).schema_id
+            except Exception as e:
+                log_error("Schema Registry lookup failed", f"subject={subject}, error={e}", exc=e)
+                raise
+
+        _SUBJECT_SCHEMA_ID_CACHE[key] = schema_id
+        return schema_id
+
+
+def get_pooled_service(config: dict) -> SchemaRegistryService:
+    """Return the process-wide service for a Schema Registry config.
+
+    Building a service creates a new registry client and HTTP session, so
+    callers share one per distinct config instead of building their own.
+    """
+    key = tuple(sorted(config.items()))
+    service = _SERVICE_POOL.get(key)
+    if service is None:
+        service = _SERVICE_POOL[key] = SchemaRegistryService(config)
+    return service
@@ -6,29 +6,86 @@ Replicates the exact format from producer_test.py:
 """
 
 import json
+import struct
+import threading
+from functools import lru_cache
 from io import BytesIO
 
 import fastavro
+import orjson
 
-MESSAGE_V1_SCHEMA_STR = json.dumps(
-	{
-		"type": "record",
-		"name": "MessageV1",
-		"namespace": "org.apache.fineract.avro",
-		"fields": [
-			{"name": "id", "type": "int"},
-			{"name": "source", "type": "string"},
-			{"name": "type", "type": "string"},
-			{"name": "category", "type": "string"},
-			{"name": "createdAt", "type": "string"},
-			{"name": "businessDate", "type": "string"},
-			{"name": "tenantId", "type": "string"},
-			{"name": "idempotencyKey", "type": "string"},
-			{"name": "dataschema", "type": "string"},
-			{"name": "data", "type": "bytes"},
-		],
-	}
-)
+MESSAGE_V1_SCHEMA_DICT = {
+	"type": "record",
+	"name": "MessageV1",
+	"namespace": "org.apache.fineract.avro",
+	"fields": [
+		{"name": "id", "type": "int"},
+		{"name": "source", "type": "string"},
+		{"name": "type", "type": "string"},
+		{"name": "category", "type": "string"},
+		{"name": "createdAt", "type": "string"},
+		{"name": "businessDate", "type": "string"},
+		{"name": "tenantId", "type": "string"},
+		{"name": "idempotencyKey", "type": "string"},
+		{"name": "dataschema", "type": "string"},
+		{"name": "data", "type": "bytes"},
+	],
+}
+
+MESSAGE_V1_SCHEMA_STR = json.dumps(MESSAGE_V1_SCHEMA_DICT)
+
+
+# Subject of the envelope schema under the record name strategy
+MESSAGE_V1_SUBJECT = "org.apache.fineract.avro.MessageV1"
+
+# Confluent wire format header: magic byte 0x00 + big-endian 4-byte schema id
+_WIRE_HEADER = struct.Struct(">bI")
+
+# Envelope schema parsed once at import, for reading and writing with fastavro.
+# parse_schema does not mutate its input, so the dict is used directly.
+MESSAGE_V1_PARSED = fastavro.parse_schema(MESSAGE_V1_SCHEMA_DICT)
+
+
+# Parsed schemas by id() of the schema dict: (schema dict, parsed schema)
+_PARSED_BY_ID: dict[int, tuple[dict, dict]] = {}
+_PARSED_BY_ID_MAX = 256
+
+
+def _parse_schema(schema_dict: dict) -> dict:
+	"""Parse an Avro schema once per process, keyed by its canonical JSON.
+
+	The same dict object is usually handed back by the local schema cache
+	for every message, so it is first looked up by identity, skipping the
+	canonical dump. The entry holds a reference to the dict to keep its id
+	from being reused. Schema dicts must not be mutated after first use.
+	"""
+	entry = _PARSED_BY_ID.get(id(schema_dict))
+	if entry is not None and entry[0] is schema_dict:
+		return entry[1]
+
+	parsed = _parse_canonical_schema(orjson.dumps(schema_dict, option=orjson.OPT_SORT_KEYS))
+	if len(_PARSED_BY_ID) >= _PARSED_BY_ID_MAX:
+		_PARSED_BY_ID.clear()
+	_PARSED_BY_ID[id(schema_dict)] = (schema_dict, parsed)
+	return parsed
+
+
+@lru_cache(maxsize=256)
+def _parse_canonical_schema(canonical: bytes) -> dict:
+	return fastavro.parse_schema(orjson.loads(canonical))
+
+
+_local = threading.local()
+
+
+def _write_buffer() -> BytesIO:
+	"""Return this thread's reusable write buffer, emptied."""
+	buf = getattr(_local, "buf", None)
+	if buf is None:
+		buf = _local.buf = BytesIO()
+	buf.seek(0)
+	buf.truncate()
+	return buf
 
 
 def serialize_inner_payload(schema_dict: dict, payload: dict) -> bytes:
@@ -41,8 +98,8 @@ def serialize_inner_payload(schema_dict: dict, payload: dict) -> bytes:
 	Returns:
 		Raw Avro binary bytes.
 	"""
-	parsed_schema = fastavro.parse_schema(schema_dict)
-	buf = BytesIO()
+	parsed_schema = _parse_schema(schema_dict)
+	buf = _write_buffer()
 	fastavro.schemaless_writer(buf, parsed_schema, payload)
 	return buf.getvalue()
 
@@ -57,7 +114,7 @@ def deserialize_inner_payload(schema_dict: dict, data: bytes) -> dict:
 	Returns:
 		Deserialized payload dict.
 	"""
-	parsed_schema = fastavro.parse_schema(schema_dict)
+	parsed_schema = _parse_schema(schema_dict)
 	buf = BytesIO(data)
 	return fastavro.schemaless_reader(buf, parsed_schema)
 
@@ -131,3 +188,56 @@ def deserialize_envelope(avro_deserializer, data: bytes, topic: str) -> dict:
 
 	ctx = SerializationContext(topic, MessageField.VALUE)
 	return avro_deserializer(data, ctx)
+
+
+def read_schema_id(data: bytes) -> int:
+	"""Return the writer schema id from a Confluent wire format message.
+
+	Raises:
+	    ValueError: If the message does not start with the Confluent magic byte.
+	"""
+	if len(data) < _WIRE_HEADER.size:
+		raise ValueError(f"Message too short for Confluent wire format ({len(data)} bytes)")
+	magic, schema_id = _WIRE_HEADER.unpack_from(data)
+	if magic != 0:
+		raise ValueError(f"Unknown magic byte {magic}; not Confluent wire format")
+	return schema_id
+
+
+def deserialize_envelope_with_schema(writer_schema: dict, data: bytes) -> dict:
+	"""Decode a Confluent wire format MessageV1 envelope with fastavro.
+
+	Equivalent to the Confluent AvroDeserializer, but decodes in fastavro's
+	C reader against an already parsed writer schema instead of going through
+	the client's per-message lookup.
+
+	Args:
+	    writer_schema: Parsed schema matching the id in the message header.
+	    data: Raw Kafka message value bytes.
+
+	Returns:
+	    MessageV1 dict.
+	"""
+	buf = BytesIO(data)
+	buf.seek(_WIRE_HEADER.size)
+	return fastavro.schemaless_reader(buf, writer_schema, MESSAGE_V1_PARSED)
+
+
+def serialize_envelope_with_schema_id(schema_id: int, envelope: dict) -> bytes:
+	"""Serialize a MessageV1 envelope to Confluent wire format with fastavro.
+
+	Produces the same bytes as the Confluent AvroSerializer, given the id the
+	envelope schema is registered under, without its per-call registry
+	checks and context objects.
+
+	Args:
+	    schema_id: Schema Registry id of MESSAGE_V1_SCHEMA_STR.
+	    envelope: MessageV1 dict with all required fields.
+
+	Returns:
+	    Confluent wire format bytes [0x00][schema-id][avro-binary].
+	"""
+	buf = _write_buffer()
+	buf.write(_WIRE_HEADER.pack(0, schema_id))
+	fastavro.schemaless_writer(buf, MESSAGE_V1_PARSED, envelope)
+	return buf.getvalue()
@@ -0,0 +1,14 @@
+import frappe
+
+
+def execute():
+    """Fill Fineract Kafka Log.external_id from payloads stored before the field existed."""
+    frappe.db.sql(
+        """
+        UPDATE `tabFineract Kafka Log`
+        SET external_id = JSON_VALUE(payload_json, '$.externalId')
+        WHERE external_id IS NULL
+        AND payload_json LIKE '%externalId%'
+        AND JSON_VALID(payload_json)
+        """
+    )
@@ -7,30 +7,39 @@ Handles the full consumer flow:
 4. Dispatch actions (Sync Jobs, method calls, document operations)
 """
 
-import json
 import traceback
 
 import frappe
 
+from connect.connect.doctype.fineract_avro_schema.fineract_avro_schema import get_parsed_schema
 from connect.kafka.consumer import KafkaConsumerClient
-from connect.kafka.schema_registry import SchemaRegistryService
+from connect.kafka.schema_registry import get_pooled_service
 from connect.kafka.serialization import (
-    create_avro_deserializer,
-    deserialize_envelope,
+    deserialize_envelope_with_schema,
     deserialize_inner_payload,
+    read_schema_id,
 )
 from connect.services.schema_service import get_schema
-from connect.utils.idempotency import (
-    check_idempotency,
-    generate_consumer_idempotency_key,
-)
+from connect.utils import json, metrics
+from connect.utils.conditions import evaluate_condition
+from connect.utils.idempotency import generate_consumer_idempotency_key
 from connect.utils.logging import log_error, log_info
 
 
-def start_consumer(site: str, max_messages: int = 0):
+def start_consumer(
+    site: str,
+    max_messages: int = 0,
+    batch_size: int | None = None,
+    poll_timeout: float | None = None,
+    commit_every: int = 1,
+    commit_interval: float = 5.0,
+):
     """Start the Fineract Kafka consumer loop.
 
     Called from the bench command. Runs until SIGTERM/SIGINT.
+    `batch_size` and `poll_timeout` fall back to the consumer settings;
+    offsets are committed every `commit_every` batches or `commit_interval`
+    seconds, whichever comes first.
     """
     import frappe
 
@@ -48,25 +57,34 @@ def start_consumer(site: str, max_messages: int = 0):
         if settings.dlq_consumer_enabled and settings.dlq_topic:
             topics.append(settings.dlq_topic)
 
-        # Set up Schema Registry for deserialization
+        # Schema Registry is only consulted for envelope schema ids not cached locally
         sr_config = settings.get_schema_registry_config()
-        sr_service = SchemaRegistryService(sr_config)
-        avro_deserializer = create_avro_deserializer(sr_service.client)
+        sr_service = get_pooled_service(sr_config)
 
         # Create consumer
         consumer_config = settings.get_consumer_config()
         consumer = KafkaConsumerClient(consumer_config, topics)
 
-        def message_handler(msg):
-            _process_message(msg, avro_deserializer, settings)
-            # Release thread-local Frappe state to prevent memory leaks
-            frappe.local.release_local()
+        def batch_handler(msgs):
+            try:
+                _process_batch(msgs, sr_service, settings)
+            finally:
+                # One DB commit per batch, before its Kafka offsets are committed
+                frappe.db.commit()
+                _reset_local_caches()
+
+        if poll_timeout is None:
+            poll_timeout = (settings.consumer_poll_timeout_ms or 1000) / 1000.0
+        if not batch_size:
+            batch_size = settings.consumer_max_poll_records or 500
 
-        poll_timeout = (settings.consumer_poll_timeout_ms or 1000) / 1000.0
         consumer.start(
-            message_handler=message_handler,
+            batch_handler=batch_handler,
             poll_timeout=poll_timeout,
             max_messages=max_messages,
+            batch_size=batch_size,
+            commit_every=commit_every,
+            commit_interval=commit_interval,
         )
 
     except Exception as e:
@@ -76,151 +94,191 @@ def start_consumer(site: str, max_messages: int = 0):
         frappe.destroy()
 
 
-def _process_message(msg, avro_deserializer, settings):
-    """Process a single consumed Kafka message."""
-    topic = msg.topic()
-    partition = msg.partition()
-    offset = msg.offset()
+# Per-request caches on frappe.local that grow for as long as the consumer
+# runs; emptied after every batch instead of tearing down frappe.local
+LOCAL_CACHES = ("document_cache", "meta_cache", "cache")
 
-    try:
-        # Idempotency check
-        idempotency_key = generate_consumer_idempotency_key(topic, partition, offset)
-        if check_idempotency(idempotency_key):
-            log_info(
-                "Consumer skipping duplicate",
-                f"topic={topic} partition={partition} offset={offset}",
-            )
-            return
+# Savepoint wrapping each message of a batch
+MESSAGE_SAVEPOINT = "connect_consume_message"
 
-        # Deserialize envelope
-        envelope = deserialize_envelope(avro_deserializer, msg.value(), topic)
 
-        # Use the idempotency key from the envelope if available
-        envelope_idem_key = envelope.get("idempotencyKey", idempotency_key)
+def _process_batch(msgs: list, sr_service, settings):
+    """Process a batch of consumed Kafka messages.
 
-        event_type = envelope.get("type", "")
-        tenant_id = envelope.get("tenantId", "")
-        dataschema = envelope.get("dataschema", "")
+    Envelopes are decoded first and the Kafka Log rows of the whole batch
+    are written with one INSERT; each message is then handled in order,
+    inside its own savepoint. Nothing is committed here: the caller commits
+    once per batch.
+    """
+    from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import (
+        FineractKafkaLog,
+    )
 
-        # Create Kafka Log
-        from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import (
-            FineractKafkaLog,
-        )
+    decoded = []
+    for msg in msgs:
+        try:
+            # Deserialize envelope against its (cached) writer schema
+            value = msg.value()
+            writer_schema = get_parsed_schema(read_schema_id(value), sr_service)
+            decoded.append((msg, deserialize_envelope_with_schema(writer_schema, value)))
+        except Exception as e:
+            _record_processing_error(msg, e)
 
-        log = FineractKafkaLog.log_consumed(
-            idempotency_key=envelope_idem_key,
-            event_type=event_type,
-            topic=topic,
-            partition=partition,
-            offset=offset,
-            tenant_id=tenant_id,
+    if not decoded:
+        return
+
+    try:
+        # Rows are keyed by idempotency key, so this single upsert also tells
+        # us which messages were seen before.
+        logs = FineractKafkaLog.log_consumed_bulk(
+            [
+                {
+                    # Use the idempotency key from the envelope if available
+                    "idempotency_key": envelope.get("idempotencyKey")
+                    or generate_consumer_idempotency_key(msg.topic(), msg.partition(), msg.offset()),
+                    "event_type": envelope.get("type", ""),
+                    "topic": msg.topic(),
+                    "partition": msg.partition(),
+                    "offset": msg.offset(),
+                    "tenant_id": envelope.get("tenantId", ""),
+                }
+                for msg, envelope in decoded
+            ]
         )
+    except Exception as e:
+        for msg, _envelope in decoded:
+            _record_processing_error(msg, e)
+        return
 
-        # Deserialize inner payload
-        inner_data = envelope.get("data", b"")
-        inner_payload = {}
-        if inner_data and dataschema:
-            try:
-                inner_schema = get_schema(dataschema, settings)
-                inner_payload = deserialize_inner_payload(inner_schema, inner_data)
-            except Exception as e:
-                log_error("Inner payload deserialization failed", str(e), exc=e)
-                log.mark_dead_letter(f"Deserialization failed: {e}")
-                frappe.db.commit()
-                return
+    for (msg, envelope), log in zip(decoded, logs, strict=True):
+        # A failing message only rolls back its own writes, not the batch's
+        frappe.db.savepoint(MESSAGE_SAVEPOINT)
+        try:
+            _handle_message(msg, envelope, log, settings)
+        except Exception as e:
+            frappe.db.rollback(save_point=MESSAGE_SAVEPOINT)
+            _record_processing_error(msg, e)
 
-        # Store payload if configured
-        if settings.log_payload_on_success:
-            log.db_set(
-                "payload_json",
-                json.dumps(inner_payload, default=str),
-                update_modified=False,
-            )
 
-        # Find matching handler
-        handler = _find_handler(event_type)
-        if not handler:
-            log.mark_skipped(f"No handler for event type: {event_type}")
-            frappe.db.commit()
+def _handle_message(msg, envelope: dict, log, settings):
+    """Deserialize, route and dispatch a single logged message."""
+    topic = msg.topic()
+    event_type = envelope.get("type", "")
+    dataschema = envelope.get("dataschema", "")
+
+    if log.flags.is_duplicate and log.is_completed():
+        metrics.inc("kafka.consumed.duplicate", topic=topic)
+        return
+
+    # Find matching handler first: unhandled messages skip payload decoding
+    handler = _find_handler(event_type)
+    if not handler:
+        log.mark_skipped(f"No handler for event type: {event_type}")
+        return
+
+    # Deserialize inner payload
+    inner_data = envelope.get("data", b"")
+    inner_payload = {}
+    if inner_data and dataschema:
+        try:
+            inner_schema = get_schema(dataschema, settings)
+            inner_payload = deserialize_inner_payload(inner_schema, inner_data)
+        except Exception as e:
+            log_error("Inner payload deserialization failed", str(e), exc=e)
+            log.mark_dead_letter(f"Deserialization failed: {e}")
+            return
+
+    # Store the handler, the externalId for correlation, and the payload if configured
+    log_values = {"handler_name": handler.handler_name}
+    external_id = inner_payload.get("externalId")
+    if external_id not in (None, ""):
+        log_values["external_id"] = str(external_id)
+    if settings.log_payload_on_success:
+        log_values["payload_json"] = json.dumps(inner_payload, default=str)
+    log._bulk_set(**log_values)
+
+    # Evaluate handler condition
+    if handler.condition:
+        try:
+            result = evaluate_condition(
+                handler.condition,
+                {
+                    "payload": inner_payload,
+                    "envelope": envelope,
+                    "frappe": frappe,
+                },
+            )
+            if not result:
+                log.mark_skipped("Handler condition returned falsy")
+                return
+        except Exception as e:
+            log.mark_failed(
+                f"Handler condition eval failed: {e}", traceback.format_exc()
+            )
             return
 
-        log.db_set("handler_name", handler.handler_name, update_modified=False)
+    # Dispatch actions. The raw payload bytes are decoded by now and are not
+    # passed on to actions, so drop them once instead of copying per action.
+    envelope.pop("data", None)
+    _dispatch_actions(handler, inner_payload, envelope, log)
+    log.mark_processed()
+    metrics.inc("kafka.consumed", topic=topic, handler=handler.handler_name)
 
-        # Evaluate handler condition
-        if handler.condition:
-            try:
-                result = frappe.safe_eval(
-                    handler.condition,
-                    eval_globals={
-                        "payload": inner_payload,
-                        "envelope": envelope,
-                        "frappe": frappe,
-                    },
-                )
-                if not result:
-                    log.mark_skipped("Handler condition returned falsy")
-                    frappe.db.commit()
-                    return
-            except Exception as e:
-                log.mark_failed(
-                    f"Handler condition eval failed: {e}", traceback.format_exc()
-                )
-                frappe.db.commit()
-                return
 
-        # Dispatch actions
-        _dispatch_actions(handler, inner_payload, envelope, log)
-        log.mark_processed()
-        frappe.db.commit()
+def _record_processing_error(msg, exc: Exception):
+    """Log a message that could not be processed and dead-letter it."""
+    topic = msg.topic()
+    partition = msg.partition()
+    offset = msg.offset()
 
-        log_info(
-            "Message consumed",
-            f"topic={topic} event={event_type} handler={handler.handler_name}",
+    log_error(
+        "Consumer message processing error",
+        f"topic={topic} partition={partition} offset={offset} error={exc}",
+        exc=exc,
+    )
+    # Try to log the error
+    try:
+        from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import (
+            FineractKafkaLog,
         )
 
-    except Exception as e:
-        log_error(
-            "Consumer message processing error",
-            f"topic={topic} partition={partition} offset={offset} error={e}",
-            exc=e,
+        idem_key = generate_consumer_idempotency_key(topic, partition, offset)
+        error_log = FineractKafkaLog.log_consumed(
+            idempotency_key=idem_key,
+            event_type="UNKNOWN",
+            topic=topic,
+            partition=partition,
+            offset=offset,
         )
-        # Try to log the error
-        try:
-            from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import (
-                FineractKafkaLog,
-            )
+        error_log.mark_dead_letter(str(exc))
+    except Exception:
+        pass
 
-            idem_key = generate_consumer_idempotency_key(topic, partition, offset)
-            error_log = FineractKafkaLog.log_consumed(
-                idempotency_key=idem_key,
-                event_type="UNKNOWN",
-                topic=topic,
-                partition=partition,
-                offset=offset,
-            )
-            error_log.mark_dead_letter(str(e))
-            frappe.db.commit()
-        except Exception:
-            pass
+
+def _reset_local_caches():
+    """Empty the request-scoped caches the long-running consumer keeps filling.
+
+    The consumer is a single long request, so frappe.local is kept (with its
+    DB connection) and only these caches are cleared.
+    """
+    for name in LOCAL_CACHES:
+        cache = getattr(frappe.local, name, None)
+        if isinstance(cache, dict):
+            cache.clear()
 
 
 def _find_handler(event_type: str):
     """Find an enabled event handler matching the business event type."""
-    handlers = frappe.get_all(
-        "Fineract Event Handler",
-        filters={
-            "enabled": 1,
-            "business_event_type": event_type,
-        },
-        fields=["name"],
-    )
-    if handlers:
-        return frappe.get_doc("Fineract Event Handler", handlers[0].name)
-    return None
+    from connect.connect.doctype.fineract_event_handler.fineract_event_handler import get_handler
+
+    return get_handler(event_type)
 
 
 def _dispatch_actions(handler, payload: dict, envelope: dict, log):
-    """Execute all enabled actions for a handler."""
+    """Execute all enabled actions for a handler.
+
+    `envelope` must already be stripped of its raw `data` bytes.
+    """
     for action in handler.actions:
         if not action.enabled:
             continue
@@ -247,7 +305,7 @@ def _dispatch_sync_job(action, payload: dict, envelope: dict):
 
         context = {
             "payload": payload,
-            "envelope": {k: v for k, v in envelope.items() if k != "data"},
+            "envelope": envelope,
         }
 
         enqueue_sync_job(
@@ -273,7 +331,7 @@ def _dispatch_method_call(action, payload: dict, envelope: dict):
         queue=action.queue or "default",
         timeout=300,
         payload=payload,
-        envelope={k: v for k, v in envelope.items() if k != "data"},
+        envelope=envelope,
     )
     log_info("Method call enqueued", f"method={action.method_path}")
 
@@ -281,7 +339,7 @@ def _dispatch_method_call(action, payload: dict, envelope: dict):
 def _dispatch_document_action(action, payload: dict, envelope: dict):
     """Enqueue a document create/update action."""
     frappe.enqueue(
-        "connect.background_jobs.process_business_event.process_document_action",
+        "connect.jobs.process_business_event.process_document_action",
         queue=action.queue or "default",
         timeout=300,
         action_type=action.action_type,
@@ -289,6 +347,7 @@ def _dispatch_document_action(action, payload: dict, envelope: dict):
         field_mapping_json=action.field_mapping_json,
         correlation_field=action.correlation_field,
         payload=payload,
+        direct_update=action.direct_update,
     )
     log_info(
         "Document action enqueued",
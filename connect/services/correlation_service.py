@@ -7,15 +7,13 @@ from connect.utils.logging import log_error, log_info
 def correlate_messages(produced_log_name: str, consumed_log_name: str):
     """Link a produced Kafka log entry to a consumed one (bidirectional)."""
     try:
-        frappe.db.set_value(
-            "Fineract Kafka Log", produced_log_name,
-            "correlated_log", consumed_log_name,
-            update_modified=False,
-        )
-        frappe.db.set_value(
-            "Fineract Kafka Log", consumed_log_name,
-            "correlated_log", produced_log_name,
-            update_modified=False,
+        frappe.db.sql(
+            """
+            UPDATE `tabFineract Kafka Log`
+            SET correlated_log = CASE name WHEN %(produced)s THEN %(consumed)s ELSE %(produced)s END
+            WHERE name IN (%(produced)s, %(consumed)s)
+            """,
+            {"produced": produced_log_name, "consumed": consumed_log_name},
         )
         log_info("Messages correlated", f"produced={produced_log_name} ↔ consumed={consumed_log_name}")
     except Exception as e:
@@ -45,32 +43,27 @@ def find_consumed_log(idempotency_key: str) -> str | None:
 def auto_correlate_by_external_id(external_id: str):
     """Try to correlate produced and consumed messages sharing an external ID.
 
-    Searches payloads for matching externalId values.
+    Matches the latest produced and the latest consumed log carrying the
+    externalId, each found by a seek on (direction, external_id, creation).
     """
     try:
-        produced = frappe.db.sql(
-            """
-            SELECT name FROM `tabFineract Kafka Log`
-            WHERE direction = 'Produced'
-            AND payload_json LIKE %s
-            ORDER BY creation DESC LIMIT 1
-            """,
-            (f'%"externalId": "{external_id}"%',),
-            as_dict=True,
-        )
-        consumed = frappe.db.sql(
+        rows = frappe.db.sql(
             """
-            SELECT name FROM `tabFineract Kafka Log`
-            WHERE direction = 'Consumed'
-            AND payload_json LIKE %s
-            ORDER BY creation DESC LIMIT 1
+            (SELECT name, direction FROM `tabFineract Kafka Log`
+            WHERE direction = 'Produced' AND external_id = %(external_id)s
+            ORDER BY creation DESC LIMIT 1)
+            UNION ALL
+            (SELECT name, direction FROM `tabFineract Kafka Log`
+            WHERE direction = 'Consumed' AND external_id = %(external_id)s
+            ORDER BY creation DESC LIMIT 1)
             """,
-            (f'%"externalId": "{external_id}"%',),
+            {"external_id": external_id},
             as_dict=True,
         )
+        latest = {row.direction: row.name for row in rows}
 
-        if produced and consumed:
-            correlate_messages(produced[0].name, consumed[0].name)
+        if "Produced" in latest and "Consumed" in latest:
+            correlate_messages(latest["Produced"], latest["Consumed"])
             return True
     except Exception as e:
         log_error("Auto-correlation failed", str(e), exc=e)
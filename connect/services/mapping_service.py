@@ -2,12 +2,33 @@
 
 Resolves field mappings from Fineract Event Emission Rule child table rows
 into a payload dict suitable for Avro serialization.
+
+Mappings are compiled once into a plan of pre-bound resolvers and coercers,
+so building a payload for each document event only calls them.
 """
+from functools import lru_cache, partial
+
 import frappe
 
+from connect.utils.conditions import evaluate_condition
 from connect.utils.logging import log_error
 from connect.utils.validation import validate_avro_field_value
 
+# Compiled plans per (site, rule name): (rule modified timestamp, plan)
+_RULE_PLANS: dict[tuple[str, str], tuple[str, tuple]] = {}
+
+_MAPPING_FIELDS = (
+    "avro_field",
+    "avro_type",
+    "source_type",
+    "source_field",
+    "source_expression",
+    "static_value",
+    "method_path",
+    "is_nullable",
+    "default_value",
+)
+
 
 def build_payload(doc, field_mappings: list) -> dict:
     """Build an Avro payload dict from document + field mappings.
@@ -19,71 +40,144 @@ def build_payload(doc, field_mappings: list) -> dict:
     Returns:
         Dict with resolved values keyed by avro_field.
     """
+    return build_payload_compiled(doc, compile_mappings(field_mappings))
+
+
+def build_payload_compiled(doc, plan: tuple) -> dict:
+    """Build an Avro payload dict from a document and a compiled mapping plan."""
     payload = {}
 
-    for mapping in field_mappings:
+    for avro_field, resolve, coerce, default_value, is_nullable, source_type in plan:
         try:
-            raw_value = _resolve_source(doc, mapping)
-            coerced = _coerce_value(raw_value, mapping)
-            payload[mapping.avro_field] = coerced
+            raw_value = resolve(doc)
+            # Apply default if value is None
+            if raw_value is None and default_value:
+                raw_value = default_value
+            payload[avro_field] = coerce(raw_value)
         except Exception as e:
             log_error(
                 "Field mapping resolution failed",
-                f"field={mapping.avro_field}, source_type={mapping.source_type}, error={e}",
+                f"field={avro_field}, source_type={source_type}, error={e}",
                 exc=e,
             )
             # If nullable, set to None; otherwise propagate the error
-            if mapping.is_nullable:
-                payload[mapping.avro_field] = None
+            if is_nullable:
+                payload[avro_field] = None
             else:
                 raise
 
     return payload
 
 
-def _resolve_source(doc, mapping) -> object:
-    """Resolve the source value based on source_type.
+def compile_rule(rule) -> tuple:
+    """Return the compiled mapping plan of an emission rule.
+
+    Cached per process by rule name and `modified`, which changes whenever
+    the rule or its mapping rows are saved, so no invalidation is needed.
+    `rule` may be a bare header row without `field_mappings`; the mapping
+    rows are then only read from the database when the plan is not cached.
+    """
+    key = (frappe.local.site, rule.name)
+    modified = str(rule.modified)
+    cached = _RULE_PLANS.get(key)
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    field_mappings = getattr(rule, "field_mappings", None)
+    if field_mappings is None:
+        field_mappings = frappe.get_all(
+            "Fineract Field Mapping",
+            filters={"parent": rule.name, "parenttype": "Fineract Event Emission Rule"},
+            fields=list(_MAPPING_FIELDS),
+            order_by="idx",
+        )
+
+    plan = compile_mappings(field_mappings)
+    _RULE_PLANS[key] = (modified, plan)
+    return plan
+
+
+def compile_mappings(field_mappings: list) -> tuple:
+    """Compile field mapping rows into a plan for `build_payload_compiled`.
+
+    Each entry is (avro_field, resolver, coercer, default_value, is_nullable,
+    source_type), where `resolver(doc)` returns the raw source value and
+    `coercer(value)` converts it to the Avro type.
+    """
+    return tuple(_compile_mapping(mapping) for mapping in field_mappings)
+
+
+def _compile_mapping(mapping) -> tuple:
+    """Pre-bind the resolver and coercer for one mapping row.
 
     Supports four source types:
     - Field: Direct doc.get(source_field)
-    - Expression: frappe.safe_eval(expr, {"doc": doc})
-    - Static: Fixed string value
+    - Expression: sandboxed eval of source_expression with {"doc": doc}
+    - Static: Fixed string value, coerced once here
     - Method: frappe.get_attr(dotted_path)(doc)
     """
     source_type = mapping.source_type
+    compile_resolver = _RESOLVER_COMPILERS.get(source_type)
+    if compile_resolver is None:
+        resolve = partial(_unknown_source, source_type)
+    else:
+        resolve = compile_resolver(mapping)
 
-    if source_type == "Field":
-        return doc.get(mapping.source_field)
+    is_nullable = bool(mapping.is_nullable)
+    coerce = partial(validate_avro_field_value, avro_type=mapping.avro_type, is_nullable=is_nullable)
 
-    elif source_type == "Expression":
-        return frappe.safe_eval(
-            mapping.source_expression,
-            eval_globals={"doc": doc, "frappe": frappe},
-        )
+    if source_type == "Static":
+        value = mapping.static_value
+        if value is None and mapping.default_value:
+            value = mapping.default_value
+        try:
+            coerced = coerce(value)
+        except Exception:
+            # Leave it to build time, which logs the error or nulls the field
+            pass
+        else:
+            return (mapping.avro_field, lambda doc: coerced, _identity, None, is_nullable, source_type)
 
-    elif source_type == "Static":
-        return mapping.static_value
+    return (mapping.avro_field, resolve, coerce, mapping.default_value, is_nullable, source_type)
 
-    elif source_type == "Method":
-        method = frappe.get_attr(mapping.method_path)
-        return method(doc)
 
-    else:
-        raise ValueError(f"Unknown source_type: {source_type}")
+def _compile_field(mapping):
+    source_field = mapping.source_field
+    return lambda doc: doc.get(source_field)
 
 
-def _coerce_value(value, mapping):
-    """Coerce a resolved value to the target Avro type.
+def _compile_expression(mapping):
+    expression = mapping.source_expression
+    return lambda doc: evaluate_condition(expression, {"doc": doc, "frappe": frappe})
 
-    Handles nullable unions and default values.
-    """
-    # Apply default if value is None
-    if value is None and mapping.default_value:
-        value = mapping.default_value
-
-    # Validate and coerce to Avro type
-    return validate_avro_field_value(
-        value,
-        avro_type=mapping.avro_type,
-        is_nullable=bool(mapping.is_nullable),
-    )
+
+def _compile_static(mapping):
+    static_value = mapping.static_value
+    return lambda doc: static_value
+
+
+def _compile_method(mapping):
+    method_path = mapping.method_path
+    return lambda doc: _get_method(method_path)(doc)
+
+
+_RESOLVER_COMPILERS = {
+    "Field": _compile_field,
+    "Expression": _compile_expression,
+    "Static": _compile_static,
+    "Method": _compile_method,
+}
+
+
+@lru_cache(maxsize=256)
+def _get_method(method_path: str):
+    """Resolve a dotted method path once per process."""
+    return frappe.get_attr(method_path)
+
+
+def _unknown_source(source_type: str, doc):
+    raise ValueError(f"Unknown source_type: {source_type}")
+
+
+def _identity(value):
+    return value
@@ -6,27 +6,58 @@ Handles the full producer flow:
 3. Background job enqueued (after commit)
 """
 
-import json
+import atexit
+import hashlib
 from datetime import date, datetime
 
 import frappe
 
+from connect.connect.doctype.fineract_kafka_settings.fineract_kafka_settings import (
+	FineractKafkaSettings,
+)
 from connect.kafka.producer import KafkaProducerClient
-from connect.kafka.schema_registry import SchemaRegistryService
+from connect.kafka.schema_registry import get_pooled_service
 from connect.kafka.serialization import (
-	create_avro_serializer,
-	serialize_envelope,
+	MESSAGE_V1_SCHEMA_STR,
+	MESSAGE_V1_SUBJECT,
+	serialize_envelope_with_schema_id,
 	serialize_inner_payload,
 )
-from connect.services.mapping_service import build_payload
+from connect.services.mapping_service import build_payload_compiled, compile_rule
 from connect.services.schema_service import get_schema
-from connect.utils.idempotency import (
-	check_idempotency,
-	generate_idempotency_key,
-	generate_uuid,
-)
+from connect.utils import json
+from connect.utils.conditions import evaluate_condition
+from connect.utils.idempotency import generate_idempotency_key
 from connect.utils.logging import log_error, log_info
 
+# Frappe method names → emission rule document events
+EVENT_MAP = {
+	"after_insert": "after_insert",
+	"on_update": "on_update",
+	"on_submit": "on_submit",
+	"on_cancel": "on_cancel",
+	"on_trash": "on_trash",
+}
+
+# frappe.local attribute holding this request's get_matching_rules results
+MATCHING_RULES_LOCAL_KEY = "connect_matching_rules"
+
+# Rule header fields produce_message needs; mappings come from compile_rule
+_RULE_FIELDS = (
+	"name",
+	"modified",
+	"command_type",
+	"command_category",
+	"avro_schema_name",
+	"topic_override",
+	"tenant_id_override",
+)
+
+# Long-lived producers per (site, config fingerprint). Creating a producer
+# starts librdkafka threads and broker connections, so a worker keeps one
+# for as long as the settings it was built from stay the same.
+_PRODUCERS: dict[tuple, KafkaProducerClient] = {}
+
 
 def on_document_event(doc, method: str):
 	"""Wildcard doc_events handler.
@@ -35,27 +66,17 @@ def on_document_event(doc, method: str):
 	then enqueues background jobs for matching rules.
 	"""
 	try:
-		settings = frappe.get_single("Fineract Kafka Settings")
-		if not settings.enabled:
+		event_name = EVENT_MAP.get(method)
+		if not event_name:
 			return
 
-		# Fast early exit: check if this DocType has any active rules
-		active_doctypes = settings.get_active_doctypes()
-		if doc.doctype not in active_doctypes:
+		# Fast early exit, before anything else is loaded: this runs for every
+		# document event on the site and most DocTypes have no rules
+		if doc.doctype not in FineractKafkaSettings.get_active_doctypes():
 			return
 
-		# Map Frappe method names to our event names
-		event_map = {
-			"after_insert": "after_insert",
-			"on_update": "on_update",
-			"on_submit": "on_submit",
-			"on_cancel": "on_cancel",
-			"on_trash": "on_trash",
-		}
-
-		event_name = event_map.get(method)
-
-		if not event_name:
+		settings = FineractKafkaSettings.get_settings()
+		if not settings.enabled:
 			return
 
 		# Find matching rules
@@ -63,11 +84,12 @@ def on_document_event(doc, method: str):
 		if not rules:
 			return
 
+		matched = []
 		for rule in rules:
 			# Evaluate condition
 			if rule.condition:
 				try:
-					result = frappe.safe_eval(rule.condition, eval_globals={"doc": doc, "frappe": frappe})
+					result = evaluate_condition(rule.condition, {"doc": doc, "frappe": frappe})
 					if not result:
 						continue
 				except Exception as e:
@@ -78,22 +100,16 @@ def on_document_event(doc, method: str):
 					)
 					continue
 
-			# Enqueue background job
 			idempotency_key = generate_idempotency_key(
 				doc.doctype, doc.name, event_name, rule.command_type, rule.rule_name
 			)
+			matched.append((rule.rule_name, idempotency_key))
 
-			frappe.enqueue(
-				"connect.background_jobs.produce_message.produce_fineract_command",
-				queue="default",
-				timeout=120,
-				enqueue_after_commit=True,
-				deduplicate=True,
-				doctype=doc.doctype,
-				docname=doc.name,
-				rule_name=rule.rule_name,
-				idempotency_key=idempotency_key,
-			)
+		# Enqueue background job: one per document event, however many rules matched
+		if len(matched) == 1:
+			enqueue_produce(doc.doctype, doc.name, *matched[0])
+		elif matched:
+			enqueue_produce_batch(doc.doctype, doc.name, matched)
 
 	except Exception as e:
 		log_error(
@@ -103,8 +119,65 @@ def on_document_event(doc, method: str):
 		)
 
 
+def enqueue_produce(doctype: str, docname: str, rule_name: str, idempotency_key: str):
+	"""Enqueue the produce job for one document/rule once the transaction commits.
+
+	Jobs are deduplicated on the idempotency key, so a job that is still
+	queued is not enqueued a second time.
+	"""
+	frappe.enqueue(
+		"connect.jobs.produce_message.produce_fineract_command",
+		queue="default",
+		timeout=120,
+		enqueue_after_commit=True,
+		job_id=f"connect_produce:{idempotency_key}",
+		deduplicate=True,
+		doctype=doctype,
+		docname=docname,
+		rule_name=rule_name,
+		idempotency_key=idempotency_key,
+	)
+
+
+def enqueue_produce_batch(doctype: str, docname: str, rules: list[tuple[str, str]]):
+	"""Enqueue one produce job for several rules of a document once the transaction commits.
+
+	Args:
+		rules: (rule_name, idempotency_key) pairs, in rule priority order.
+	"""
+	batch_key = hashlib.sha256("|".join(key for _rule, key in rules).encode()).hexdigest()
+	frappe.enqueue(
+		"connect.jobs.produce_message.produce_fineract_commands",
+		queue="default",
+		timeout=120 * len(rules),
+		enqueue_after_commit=True,
+		job_id=f"connect_produce_batch:{batch_key}",
+		deduplicate=True,
+		doctype=doctype,
+		docname=docname,
+		rules=[list(rule) for rule in rules],
+	)
+
+
 def get_matching_rules(doctype: str, event_name: str) -> list:
-	"""Get all enabled emission rules matching a DocType and event."""
+	"""Get all enabled emission rules matching a DocType and event.
+
+	Memoized on frappe.local for the rest of the request or job, so a bulk
+	import firing events for many documents of one DocType queries once.
+	The returned list is shared: do not modify it.
+	"""
+	matching_rules = getattr(frappe.local, MATCHING_RULES_LOCAL_KEY, None)
+	if matching_rules is None:
+		matching_rules = {}
+		setattr(frappe.local, MATCHING_RULES_LOCAL_KEY, matching_rules)
+
+	key = (doctype, event_name)
+	if key not in matching_rules:
+		matching_rules[key] = _query_matching_rules(doctype, event_name)
+	return matching_rules[key]
+
+
+def _query_matching_rules(doctype: str, event_name: str) -> list:
 	rules = frappe.get_all(
 		"Fineract Event Emission Rule",
 		filters={
@@ -139,18 +212,14 @@ def produce_message(
 	Called from the background job after document and rule are loaded.
 	"""
 	if settings is None:
-		settings = frappe.get_single("Fineract Kafka Settings")
+		settings = FineractKafkaSettings.get_settings()
 
-	rule = frappe.get_doc("Fineract Event Emission Rule", rule_name)
+	rule = _load_rule(rule_name)
 	topic = rule.topic_override or settings.command_topic
 	tenant_id = rule.tenant_id_override or settings.default_tenant_id
 
-	# Idempotency check
-	if check_idempotency(idempotency_key):
-		log_info("Skipping duplicate", f"key={idempotency_key}, rule={rule_name}")
-		return
-
-	# Create Kafka Log (Pending)
+	# Create Kafka Log (Pending). Rows are keyed by idempotency key, so this
+	# single upsert also tells us whether the message was seen before.
 	from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import (
 		FineractKafkaLog,
 	)
@@ -163,11 +232,17 @@ def produce_message(
 		source_doctype=doc.doctype,
 		source_docname=doc.name,
 		rule_name=rule_name,
+		message_key=idempotency_key,
 	)
 
+	if log.flags.is_duplicate and log.is_completed():
+		log_info("Skipping duplicate", f"key={idempotency_key}, rule={rule_name}")
+		frappe.db.commit()
+		return
+
 	try:
-		# Build inner payload via field mappings
-		payload_dict = build_payload(doc, rule.field_mappings)
+		# Build inner payload via the rule's (cached) compiled field mappings
+		payload_dict = build_payload_compiled(doc, compile_rule(rule))
 
 		# Get inner Avro schema
 		inner_schema = get_schema(rule.avro_schema_name, settings)
@@ -190,38 +265,30 @@ def produce_message(
 		}
 
 		# Serialize envelope with Confluent wire format
-		sr_config = settings.get_schema_registry_config()
-		sr_service = SchemaRegistryService(sr_config)
-		avro_serializer = create_avro_serializer(
-			sr_service.client,
+		sr_service = get_pooled_service(settings.get_schema_registry_config())
+		envelope_schema_id = sr_service.get_schema_id(
+			MESSAGE_V1_SUBJECT,
+			MESSAGE_V1_SCHEMA_STR,
 			auto_register=bool(settings.auto_register_schemas),
 		)
-		serialized_value = serialize_envelope(avro_serializer, envelope, topic)
+		serialized_value = serialize_envelope_with_schema_id(envelope_schema_id, envelope)
 
 		# Produce to Kafka
-		producer_config = settings.get_producer_config()
-		producer = KafkaProducerClient(producer_config)
+		producer = _get_producer(settings)
 		delivery = producer.produce(
 			topic=topic,
 			key=idempotency_key,
 			value=serialized_value,
 		)
 
-		# Update log with delivery metadata
-		if delivery:
-			log.mark_delivered(
-				partition=delivery.get("partition"),
-				offset=delivery.get("offset"),
-			)
-			log.db_set("message_key", idempotency_key, update_modified=False)
-
-		# Optionally log payload
-		if settings.log_payload_on_success:
-			log.db_set(
-				"payload_json",
-				json.dumps(payload_dict, default=str),
-				update_modified=False,
-			)
+		# Record delivery metadata, the correlation id and the optional
+		# payload snapshot in one UPDATE
+		log.mark_delivered(
+			partition=delivery.get("partition"),
+			offset=delivery.get("offset"),
+			external_id=_external_id(payload_dict),
+			payload_json=json.dumps(payload_dict, default=str) if settings.log_payload_on_success else None,
+		)
 
 		log_info(
 			"Message produced",
@@ -235,3 +302,45 @@ def produce_message(
 		log.mark_failed(str(e), traceback.format_exc())
 		frappe.db.commit()
 		raise
+
+
+def _load_rule(rule_name: str):
+	"""Fetch the emission rule header in one query, without its child tables."""
+	rule = frappe.db.get_value("Fineract Event Emission Rule", rule_name, _RULE_FIELDS, as_dict=True)
+	if not rule:
+		frappe.throw(f"Fineract Event Emission Rule {rule_name} not found", frappe.DoesNotExistError)
+	return rule
+
+
+def _get_producer(settings) -> KafkaProducerClient:
+	"""Return this process's producer for the current settings, creating it once."""
+	config = settings.get_producer_config()
+	key = _client_key(config)
+	producer = _PRODUCERS.get(key)
+	if producer is None:
+		# Settings changed (or first use): retire this site's old producer
+		for stale_key in [k for k in _PRODUCERS if k[0] == key[0]]:
+			_PRODUCERS.pop(stale_key).close()
+		producer = _PRODUCERS[key] = KafkaProducerClient(config)
+	return producer
+
+
+def _external_id(payload: dict) -> str | None:
+	"""Return the payload's externalId, stored on the log for correlation."""
+	external_id = payload.get("externalId")
+	return str(external_id) if external_id not in (None, "") else None
+
+
+def _client_key(config: dict) -> tuple:
+	return (frappe.local.site, tuple(sorted(config.items())))
+
+
+@atexit.register
+def _close_producers():
+	"""Deliver anything still queued when the worker process exits."""
+	for producer in _PRODUCERS.values():
+		try:
+			producer.close()
+		except Exception:
+			pass
+	_PRODUCERS.clear()
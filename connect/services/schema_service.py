@@ -1,27 +1,52 @@
 """Schema service — three-layer cache resolution for Avro schemas.
 
 Cache layers:
-1. Redis (fastest, TTL-based)
+0. Process-local (parsed dicts, short TTL)
+1. Redis (TTL-based)
 2. MariaDB (Fineract Avro Schema DocType, persistent)
 3. Schema Registry (authoritative, network call)
 """
-import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import frappe
 from frappe.utils import now_datetime
 
+from connect.utils import json
 from connect.utils.cache import cache_delete, cache_get, cache_set
 from connect.utils.logging import log_error, log_info
 
 
 SCHEMA_CACHE_PREFIX = "fineract_schema:"
 
+# Seconds a process serves a parsed schema without asking Redis
+LOCAL_SCHEMA_TTL = 60
+
+# Concurrent Schema Registry fetches in refresh_schema_cache
+REFRESH_WORKERS = 16
+
+# Parsed schemas per (site, schema name): (expires_at, schema dict)
+_LOCAL_SCHEMAS: dict[tuple[str, str], tuple[float, dict]] = {}
+
 
 def get_schema(schema_name: str, settings=None) -> dict:
-    """Resolve a schema by name through the three-layer cache.
+    """Resolve a schema by name through the layered cache.
 
-    Returns the parsed schema dict.
+    Returns the parsed schema dict. It is shared between callers in this
+    process: do not modify it.
     """
+    local_key = (frappe.local.site, schema_name)
+    local = _LOCAL_SCHEMAS.get(local_key)
+    if local and time.monotonic() < local[0]:
+        return local[1]
+
+    schema_dict = _resolve_schema(schema_name, settings)
+    _LOCAL_SCHEMAS[local_key] = (time.monotonic() + LOCAL_SCHEMA_TTL, schema_dict)
+    return schema_dict
+
+
+def _resolve_schema(schema_name: str, settings=None) -> dict:
+    """Resolve a schema through Redis, MariaDB and the Schema Registry."""
     if settings is None:
         settings = frappe.get_single("Fineract Kafka Settings")
 
@@ -59,24 +84,27 @@ def get_schema(schema_name: str, settings=None) -> dict:
 def _fetch_from_registry(schema_name: str, settings) -> dict | None:
     """Fetch a schema from Schema Registry by subject name."""
     try:
-        from connect.kafka.schema_registry import SchemaRegistryService
+        from connect.kafka.schema_registry import get_pooled_service
 
-        sr_config = settings.get_schema_registry_config()
-        sr_service = SchemaRegistryService(sr_config)
-
-        # Try subject = schema_name (common convention)
-        result = sr_service.get_latest_schema(schema_name)
-        if result:
-            return json.loads(result["schema_str"])
+        sr_service = get_pooled_service(settings.get_schema_registry_config())
+        return _fetch_latest_schema(schema_name, sr_service)
     except Exception as e:
         log_error("Schema Registry fetch failed", f"schema={schema_name}, error={e}", exc=e)
     return None
 
 
+def _fetch_latest_schema(schema_name: str, sr_service) -> dict | None:
+    # Try subject = schema_name (common convention)
+    result = sr_service.get_latest_schema(schema_name)
+    if result:
+        return json.loads(result["schema_str"])
+    return None
+
+
 def _save_schema_to_db(schema_name: str, schema_dict: dict, settings):
     """Save a fetched schema to the MariaDB cache (Fineract Avro Schema DocType)."""
     try:
-        schema_json = json.dumps(schema_dict, indent=2)
+        schema_json = json.dumps(schema_dict, indent=True)
 
         # Determine schema type from name
         schema_type = "command"
@@ -106,8 +134,10 @@ def _save_schema_to_db(schema_name: str, schema_dict: dict, settings):
 def invalidate_schema_cache(schema_name: str | None = None):
     """Invalidate schema cache. If schema_name is None, invalidate all."""
     if schema_name:
+        _LOCAL_SCHEMAS.pop((frappe.local.site, schema_name), None)
         cache_delete(f"{SCHEMA_CACHE_PREFIX}{schema_name}")
     else:
+        _LOCAL_SCHEMAS.clear()
         # Clear all schema cache entries
         schemas = frappe.get_all("Fineract Avro Schema", pluck="schema_name")
         for name in schemas:
@@ -129,16 +159,53 @@ def refresh_schema_cache():
         fields=["schema_name"],
     )
 
-    refreshed = 0
-    for schema in schemas:
+    if not schemas:
+        return
+
+    from connect.kafka.schema_registry import get_pooled_service
+
+    # Registry fetches are independent HTTP calls, so run them concurrently
+    # against one shared client
+    sr_service = get_pooled_service(settings.get_schema_registry_config())
+    names = [schema.schema_name for schema in schemas]
+    with ThreadPoolExecutor(max_workers=min(REFRESH_WORKERS, len(names))) as pool:
+        fetched = list(pool.map(lambda name: _fetch_for_refresh(name, sr_service), names))
+
+    ttl = settings.schema_cache_ttl_seconds or 3600
+    refreshed = []
+    for schema_name, (schema_dict, error) in zip(names, fetched, strict=True):
+        if error:
+            log_error("Schema Registry fetch failed", f"schema={schema_name}, error={error}", exc=error)
+            continue
+        if not schema_dict:
+            continue
         try:
-            schema_dict = _fetch_from_registry(schema.schema_name, settings)
-            if schema_dict:
-                ttl = settings.schema_cache_ttl_seconds or 3600
-                cache_key = f"{SCHEMA_CACHE_PREFIX}{schema.schema_name}"
-                cache_set(cache_key, json.dumps(schema_dict), expires_in_sec=ttl)
-                refreshed += 1
+            cache_set(f"{SCHEMA_CACHE_PREFIX}{schema_name}", json.dumps(schema_dict), expires_in_sec=ttl)
+            refreshed.append(schema_name)
         except Exception as e:
-            log_error("Schema refresh failed", f"schema={schema.schema_name}, error={e}", exc=e)
+            log_error("Schema refresh failed", f"schema={schema_name}, error={e}", exc=e)
+
+    if refreshed:
+        frappe.db.sql(
+            """
+            UPDATE `tabFineract Avro Schema`
+            SET last_fetched = %s
+            WHERE is_latest = 1 AND schema_name IN %s
+            """,
+            (now_datetime(), tuple(refreshed)),
+        )
+        frappe.db.commit()
+
+    log_info("Schema cache refresh complete", f"refreshed={len(refreshed)}/{len(schemas)}")
 
-    log_info("Schema cache refresh complete", f"refreshed={refreshed}/{len(schemas)}")
+
+def _fetch_for_refresh(schema_name: str, sr_service) -> tuple[dict | None, Exception | None]:
+    """Worker of refresh_schema_cache: returns errors instead of logging them.
+
+    Worker threads have no Frappe site context, so errors are logged from the
+    main thread once all fetches are done.
+    """
+    try:
+        return _fetch_latest_schema(schema_name, sr_service), None
+    except Exception as e:
+        return None, e
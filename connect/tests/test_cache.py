@@ -1,59 +1,46 @@
 """Tests for cache utility module.
 
-Uses mock frappe.cache() to test cache helpers without Redis.
+Uses mock frappe.cache to test cache helpers without Redis.
 """
 import unittest
 from unittest.mock import MagicMock, patch
 
+from connect.utils.cache import cache_delete, cache_get, cache_get_or_set, cache_set, cached
+
 
 class TestCacheHelpers(unittest.TestCase):
     """Test cache_get, cache_set, cache_delete, cache_get_or_set."""
 
-    @patch("connect.utils.cache.frappe")
-    def test_cache_get(self, mock_frappe):
-        """cache_get calls frappe.cache().get_value."""
-        from connect.utils.cache import cache_get
+    def setUp(self):
+        self.mock_cache = MagicMock()
+        frappe_patch = patch("connect.utils.cache.frappe")
+        mock_frappe = frappe_patch.start()
+        mock_frappe.cache = self.mock_cache
+        self.addCleanup(frappe_patch.stop)
 
-        mock_cache = MagicMock()
-        mock_cache.get_value.return_value = "cached_value"
-        mock_frappe.cache.return_value = mock_cache
+    def test_cache_get(self):
+        """cache_get calls frappe.cache.get_value."""
+        self.mock_cache.get_value.return_value = "cached_value"
 
         result = cache_get("my_key")
-        mock_cache.get_value.assert_called_once_with("my_key")
+        self.mock_cache.get_value.assert_called_once_with("my_key")
         self.assertEqual(result, "cached_value")
 
-    @patch("connect.utils.cache.frappe")
-    def test_cache_set(self, mock_frappe):
-        """cache_set calls frappe.cache().set_value."""
-        from connect.utils.cache import cache_set
-
-        mock_cache = MagicMock()
-        mock_frappe.cache.return_value = mock_cache
-
+    def test_cache_set(self):
+        """cache_set calls frappe.cache.set_value."""
         cache_set("my_key", "my_value", expires_in_sec=300)
-        mock_cache.set_value.assert_called_once_with(
+        self.mock_cache.set_value.assert_called_once_with(
             "my_key", "my_value", expires_in_sec=300
         )
 
-    @patch("connect.utils.cache.frappe")
-    def test_cache_delete(self, mock_frappe):
-        """cache_delete calls frappe.cache().delete_value."""
-        from connect.utils.cache import cache_delete
-
-        mock_cache = MagicMock()
-        mock_frappe.cache.return_value = mock_cache
-
+    def test_cache_delete(self):
+        """cache_delete calls frappe.cache.delete_value."""
         cache_delete("my_key")
-        mock_cache.delete_value.assert_called_once_with("my_key")
+        self.mock_cache.delete_value.assert_called_once_with("my_key")
 
-    @patch("connect.utils.cache.frappe")
-    def test_cache_get_or_set_hit(self, mock_frappe):
+    def test_cache_get_or_set_hit(self):
         """cache_get_or_set returns cached value when present."""
-        from connect.utils.cache import cache_get_or_set
-
-        mock_cache = MagicMock()
-        mock_cache.get_value.return_value = "exists"
-        mock_frappe.cache.return_value = mock_cache
+        self.mock_cache.get_value.return_value = "exists"
 
         fetcher = MagicMock(return_value="fresh")
         result = cache_get_or_set("key", fetcher, expires_in_sec=60)
@@ -61,24 +48,46 @@ class TestCacheHelpers(unittest.TestCase):
         self.assertEqual(result, "exists")
         fetcher.assert_not_called()
 
-    @patch("connect.utils.cache.frappe")
-    def test_cache_get_or_set_miss(self, mock_frappe):
+    def test_cache_get_or_set_miss(self):
         """cache_get_or_set calls fetcher and caches on miss."""
-        from connect.utils.cache import cache_get_or_set
-
-        mock_cache = MagicMock()
-        mock_cache.get_value.return_value = None
-        mock_frappe.cache.return_value = mock_cache
+        self.mock_cache.get_value.return_value = None
 
         fetcher = MagicMock(return_value="computed")
         result = cache_get_or_set("key", fetcher, expires_in_sec=120)
 
         self.assertEqual(result, "computed")
         fetcher.assert_called_once()
-        mock_cache.set_value.assert_called_once_with(
+        self.mock_cache.set_value.assert_called_once_with(
             "key", "computed", expires_in_sec=120
         )
 
+    def test_cached_without_args_uses_bare_key(self):
+        """@cached stores argument-less calls under the key itself."""
+        self.mock_cache.get_value.return_value = None
+
+        @cached("connect:test", ttl=30)
+        def compute():
+            return {"total": 1}
+
+        self.assertEqual(compute(), {"total": 1})
+        self.mock_cache.set_value.assert_called_once_with(
+            "connect:test", {"total": 1}, expires_in_sec=30
+        )
+
+    def test_cached_hashes_args_into_key(self):
+        """@cached derives distinct keys for distinct arguments."""
+        self.mock_cache.get_value.return_value = None
+
+        @cached("connect:test")
+        def compute(value):
+            return value
+
+        compute("a")
+        compute("b")
+        keys = [call.args[0] for call in self.mock_cache.set_value.call_args_list]
+        self.assertEqual(len(set(keys)), 2)
+        self.assertTrue(all(k.startswith("connect:test:") for k in keys))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,32 @@
+"""Tests for compiled condition evaluation."""
+import unittest
+
+from connect.utils.conditions import compile_condition, evaluate_condition
+
+
+class TestEvaluateCondition(unittest.TestCase):
+    """Test that cached conditions behave like frappe.safe_eval."""
+
+    def setUp(self):
+        compile_condition.cache_clear()
+
+    def test_truthy_condition(self):
+        self.assertTrue(evaluate_condition("doc['status'] == 'Open'", {"doc": {"status": "Open"}}))
+
+    def test_falsy_condition(self):
+        self.assertFalse(evaluate_condition("doc['status'] == 'Open'", {"doc": {"status": "Closed"}}))
+
+    def test_compiled_once_per_expression(self):
+        evaluate_condition("payload['amount'] > 10", {"payload": {"amount": 5}})
+        evaluate_condition("payload['amount'] > 10", {"payload": {"amount": 50}})
+        info = compile_condition.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_dunder_rejected(self):
+        with self.assertRaises(SyntaxError):
+            compile_condition("doc.__class__")
+
+    def test_builtins_unavailable(self):
+        with self.assertRaises(Exception):
+            evaluate_condition("open('/etc/passwd')", {})
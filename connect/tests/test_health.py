@@ -5,15 +5,18 @@ Uses mocks to simulate Kafka and Schema Registry connection results.
 import unittest
 from unittest.mock import MagicMock, patch
 
+from connect.utils import health
+from connect.utils.health import check_full_health, check_kafka_health, check_schema_registry_health
+
 
 class TestCheckKafkaHealth(unittest.TestCase):
     """Test check_kafka_health."""
 
-    @patch("connect.utils.health.log_error")
-    def test_healthy_kafka(self, mock_log_error):
-        """Returns ok when Kafka broker is reachable."""
-        from connect.utils.health import check_kafka_health
+    def setUp(self):
+        health._ADMIN_CLIENTS.clear()
 
+    def test_healthy_kafka(self):
+        """Returns ok when Kafka broker is reachable."""
         config = {"bootstrap.servers": "localhost:9092"}
 
         with patch("connect.utils.health.AdminClient") as MockAdmin:
@@ -21,20 +24,17 @@ class TestCheckKafkaHealth(unittest.TestCase):
             mock_broker = MagicMock()
             mock_broker.host = "localhost"
             mock_broker.port = 9092
-            mock_metadata = MagicMock()
-            mock_metadata.brokers.values.return_value = [mock_broker]
-            mock_admin.list_topics.return_value = mock_metadata
+            mock_cluster = MagicMock()
+            mock_cluster.nodes = [mock_broker]
+            mock_admin.describe_cluster.return_value.result.return_value = mock_cluster
             MockAdmin.return_value = mock_admin
 
             result = check_kafka_health(config)
             self.assertEqual(result["status"], "ok")
             self.assertIn("brokers", result)
 
-    @patch("connect.utils.health.log_error")
-    def test_unhealthy_kafka(self, mock_log_error):
+    def test_unhealthy_kafka(self):
         """Returns error when Kafka is unreachable."""
-        from connect.utils.health import check_kafka_health
-
         config = {"bootstrap.servers": "localhost:9092"}
 
         with patch("connect.utils.health.AdminClient") as MockAdmin:
@@ -48,11 +48,11 @@ class TestCheckKafkaHealth(unittest.TestCase):
 class TestCheckSchemaRegistryHealth(unittest.TestCase):
     """Test check_schema_registry_health."""
 
-    @patch("connect.utils.health.log_error")
-    def test_healthy_registry(self, mock_log_error):
-        """Returns ok when Schema Registry is reachable."""
-        from connect.utils.health import check_schema_registry_health
+    def setUp(self):
+        health._SR_CLIENTS.clear()
 
+    def test_healthy_registry(self):
+        """Returns ok when Schema Registry is reachable."""
         config = {"url": "http://localhost:8081"}
 
         with patch("connect.utils.health.SchemaRegistryClient") as MockSR:
@@ -63,11 +63,19 @@ class TestCheckSchemaRegistryHealth(unittest.TestCase):
             result = check_schema_registry_health(config)
             self.assertEqual(result["status"], "ok")
 
-    @patch("connect.utils.health.log_error")
-    def test_unhealthy_registry(self, mock_log_error):
-        """Returns error when Schema Registry is unreachable."""
-        from connect.utils.health import check_schema_registry_health
+    def test_client_reused_across_checks(self):
+        """Repeated checks with the same config build one client."""
+        config = {"url": "http://localhost:8081"}
+
+        with patch("connect.utils.health.SchemaRegistryClient") as MockSR:
+            MockSR.return_value.get_subjects.return_value = []
+
+            check_schema_registry_health(config)
+            check_schema_registry_health(config)
+            MockSR.assert_called_once_with(config)
 
+    def test_unhealthy_registry(self):
+        """Returns error when Schema Registry is unreachable."""
         config = {"url": "http://localhost:8081"}
 
         with patch("connect.utils.health.SchemaRegistryClient") as MockSR:
@@ -84,8 +92,6 @@ class TestCheckFullHealth(unittest.TestCase):
     @patch("connect.utils.health.check_kafka_health")
     def test_all_healthy(self, mock_kafka, mock_sr):
         """Full health returns ok when all components are healthy."""
-        from connect.utils.health import check_full_health
-
         mock_kafka.return_value = {"status": "ok", "broker": "localhost:9092"}
         mock_sr.return_value = {"status": "ok", "url": "http://localhost:8081"}
 
@@ -96,8 +102,6 @@ class TestCheckFullHealth(unittest.TestCase):
     @patch("connect.utils.health.check_kafka_health")
     def test_partial_failure(self, mock_kafka, mock_sr):
         """Full health returns error if any component fails."""
-        from connect.utils.health import check_full_health
-
         mock_kafka.return_value = {"status": "error", "error": "timeout"}
         mock_sr.return_value = {"status": "ok", "url": "http://localhost:8081"}
 
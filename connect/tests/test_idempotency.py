@@ -28,11 +28,12 @@ class TestGenerateIdempotencyKey(unittest.TestCase):
         key2 = generate_idempotency_key("Customer", "CUST-001", "on_update", "CreateClient", "Rule 1")
         self.assertNotEqual(key1, key2)
 
-    def test_key_is_sha256_hex(self):
-        """Key should be a 64-char hex string (SHA-256)."""
+    def test_key_is_blake2b_hex(self):
+        """Key should be a 32-char hex string (BLAKE2b-128)."""
         key = generate_idempotency_key("Item", "ITEM-001", "on_update", "UpdateItem", "R1")
-        self.assertEqual(len(key), 64)
-        self.assertTrue(all(c in "0123456789abcdef" for c in key))
+        self.assertEqual(len(key), 32)
+        self.assertEqual(key, key.lower())
+        self.assertEqual(len(bytes.fromhex(key)), 16)
 
 
 class TestGenerateConsumerIdempotencyKey(unittest.TestCase):
@@ -0,0 +1,34 @@
+"""Tests for the orjson-backed JSON helpers."""
+import unittest
+
+from connect.utils import json
+
+
+class TestJsonHelpers(unittest.TestCase):
+    """Test loads/dumps round-trips and options."""
+
+    def test_round_trip(self):
+        data = {"name": "Jane", "amount": 12.5, "tags": ["a", "b"], "active": True}
+        self.assertEqual(json.loads(json.dumps(data)), data)
+
+    def test_dumps_returns_str(self):
+        self.assertIsInstance(json.dumps({"a": 1}), str)
+
+    def test_loads_accepts_bytes(self):
+        self.assertEqual(json.loads(b'{"a": 1}'), {"a": 1})
+
+    def test_default_used_for_unknown_types(self):
+        from decimal import Decimal
+
+        self.assertEqual(json.dumps({"v": Decimal("1.50")}, default=str), '{"v":"1.50"}')
+
+    def test_indent(self):
+        self.assertEqual(json.dumps({"a": 1}, indent=True), '{\n  "a": 1\n}')
+
+    def test_invalid_json_raises(self):
+        with self.assertRaises(json.JSONDecodeError):
+            json.loads("{not json")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Integration test for retry bookkeeping of stale produced logs.
+
+Needs a site with the connect app installed (bench run-tests).
+"""
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from connect.connect.doctype.fineract_kafka_log.fineract_kafka_log import FineractKafkaLog
+from connect.jobs.cleanup import cleanup_kafka_logs
+
+LOG_ARGS = {
+    "command_type": "CreateClient",
+    "topic": "fineract.commands",
+    "tenant_id": "default",
+    "source_doctype": "Customer",
+    "source_docname": "CUST-RETRY-001",
+    "rule_name": "Retry Count Rule",
+}
+
+
+class TestStaleProduceRetryCount(FrappeTestCase):
+    """A stale Pending log that is re-produced counts exactly one retry."""
+
+    KEY = "test-stale-produce-retry-count"
+
+    def setUp(self):
+        self.addCleanup(self._delete_log)
+        self._delete_log()
+        FineractKafkaLog.log_produced(idempotency_key=self.KEY, **LOG_ARGS)
+        frappe.db.sql(
+            "UPDATE `tabFineract Kafka Log` SET creation = %s WHERE name = %s",
+            (add_to_date(now_datetime(), minutes=-30), self.KEY),
+        )
+
+    def _delete_log(self):
+        frappe.db.delete("Fineract Kafka Log", {"name": self.KEY})
+        frappe.db.commit()
+
+    @patch("connect.jobs.cleanup.enqueue_produce")
+    @patch("connect.jobs.cleanup.frappe.get_single")
+    def test_reproduce_increments_retry_count_once(self, mock_get_single, mock_enqueue):
+        mock_get_single.return_value = SimpleNamespace(enabled=1, log_retention_days=30, max_produce_retries=5)
+
+        cleanup_kafka_logs()
+        mock_enqueue.assert_any_call(
+            LOG_ARGS["source_doctype"],
+            LOG_ARGS["source_docname"],
+            LOG_ARGS["rule_name"],
+            self.KEY,
+        )
+
+        # The re-enqueued job logs the same key again before producing
+        log = FineractKafkaLog.log_produced(idempotency_key=self.KEY, **LOG_ARGS)
+        self.assertTrue(log.flags.is_duplicate)
+        self.assertEqual(frappe.db.get_value("Fineract Kafka Log", self.KEY, "retry_count"), 1)
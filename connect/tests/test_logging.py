@@ -0,0 +1,46 @@
+"""Tests for structured logging helpers."""
+import unittest
+from unittest.mock import patch
+
+from connect.utils import logging as connect_logging
+
+
+class TestLogError(unittest.TestCase):
+    """Test that repeated errors write a single Error Log row per interval."""
+
+    def setUp(self):
+        connect_logging._last_error_log.clear()
+        frappe_patch = patch("connect.utils.logging.frappe")
+        self.mock_frappe = frappe_patch.start()
+        self.addCleanup(frappe_patch.stop)
+
+    def test_repeated_error_written_once(self):
+        connect_logging.log_error("Kafka health check failed", "Connection refused")
+        connect_logging.log_error("Kafka health check failed", "Connection refused")
+        self.assertEqual(self.mock_frappe.log_error.call_count, 1)
+
+    def test_distinct_errors_each_written(self):
+        connect_logging.log_error("Kafka health check failed", "Connection refused")
+        connect_logging.log_error("Kafka health check failed", "Timed out")
+        self.assertEqual(self.mock_frappe.log_error.call_count, 2)
+
+    def test_written_again_after_interval(self):
+        times = [1000.0, 1000.0 + connect_logging.ERROR_LOG_INTERVAL]
+        with patch("connect.utils.logging.time.monotonic", side_effect=times):
+            connect_logging.log_error("Sync failed", "boom")
+            connect_logging.log_error("Sync failed", "boom")
+        self.assertEqual(self.mock_frappe.log_error.call_count, 2)
+
+    def test_exception_traceback_stored(self):
+        try:
+            raise RuntimeError("broker down")
+        except RuntimeError as e:
+            connect_logging.log_error("Produce failed", str(e), exc=e)
+
+        message = self.mock_frappe.log_error.call_args.kwargs["message"]
+        self.assertIn("Traceback", message)
+        self.assertIn("RuntimeError: broker down", message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,39 @@
 """Tests for the mapping service (field resolution and payload building).
 
-Uses mock document objects to avoid Frappe DB dependency.
+Uses fake document objects to avoid Frappe DB dependency.
 """
 import unittest
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+from connect.services.mapping_service import (
+    _RULE_PLANS,
+    _get_method,
+    build_payload,
+    build_payload_compiled,
+    compile_rule,
+)
+
+
+class _FakeDoc:
+    """Minimal stand-in for a Frappe document: build_payload only uses get()."""
+
+    def __init__(self, **fields):
+        self._fields = fields
+        self.doctype = fields.get("doctype", "Customer")
+        self.name = fields.get("name", "CUST-001")
+
+    def get(self, key, default=None):
+        return self._fields.get(key, default)
+
 
 class TestBuildPayload(unittest.TestCase):
     """Test build_payload with various source_type mappings."""
 
+    def setUp(self):
+        _get_method.cache_clear()
+        _RULE_PLANS.clear()
+
     def _make_mapping(self, **kwargs):
         """Create a mock field mapping row."""
         defaults = {
@@ -27,18 +51,11 @@ class TestBuildPayload(unittest.TestCase):
         return SimpleNamespace(**defaults)
 
     def _make_doc(self, **kwargs):
-        """Create a mock Frappe document."""
-        doc = MagicMock()
-        doc.get = MagicMock(side_effect=lambda k, default=None: kwargs.get(k, default))
-        doc.doctype = kwargs.get("doctype", "Customer")
-        doc.name = kwargs.get("name", "CUST-001")
-        return doc
+        """Create a fake Frappe document."""
+        return _FakeDoc(**kwargs)
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_field_source(self, mock_frappe):
+    def test_field_source(self):
         """Field source_type reads from doc.get()."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc(customer_name="John Doe")
         mapping = self._make_mapping(
             avro_field="clientName",
@@ -48,11 +65,8 @@ class TestBuildPayload(unittest.TestCase):
         result = build_payload(doc, [mapping])
         self.assertEqual(result["clientName"], "John Doe")
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_static_source(self, mock_frappe):
+    def test_static_source(self):
         """Static source_type uses the fixed static_value."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc()
         mapping = self._make_mapping(
             avro_field="source",
@@ -62,13 +76,12 @@ class TestBuildPayload(unittest.TestCase):
         result = build_payload(doc, [mapping])
         self.assertEqual(result["source"], "erpnext")
 
+    @patch("connect.services.mapping_service.evaluate_condition")
     @patch("connect.services.mapping_service.frappe")
-    def test_expression_source(self, mock_frappe):
+    def test_expression_source(self, mock_frappe, mock_evaluate):
         """Expression source_type evaluates safely."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc(first="John", last="Doe")
-        mock_frappe.safe_eval = lambda expr, eval_globals=None: eval(
+        mock_evaluate.side_effect = lambda expr, eval_globals: eval(
             expr, {"doc": eval_globals["doc"]}
         )
         mapping = self._make_mapping(
@@ -83,8 +96,6 @@ class TestBuildPayload(unittest.TestCase):
     @patch("connect.services.mapping_service.frappe")
     def test_method_source(self, mock_frappe):
         """Method source_type calls the referenced function."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc()
         mock_frappe.get_attr = MagicMock(return_value=lambda d: "computed-value")
 
@@ -96,11 +107,8 @@ class TestBuildPayload(unittest.TestCase):
         result = build_payload(doc, [mapping])
         self.assertEqual(result["computed"], "computed-value")
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_nullable_field_uses_none(self, mock_frappe):
+    def test_nullable_field_uses_none(self):
         """Nullable field resolves to None when source is missing."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc()
         mapping = self._make_mapping(
             avro_field="optional",
@@ -112,11 +120,8 @@ class TestBuildPayload(unittest.TestCase):
         result = build_payload(doc, [mapping])
         self.assertIsNone(result["optional"])
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_default_value_applied(self, mock_frappe):
+    def test_default_value_applied(self):
         """Default value is used when source resolves to None."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc()
         mapping = self._make_mapping(
             avro_field="withDefault",
@@ -128,11 +133,8 @@ class TestBuildPayload(unittest.TestCase):
         result = build_payload(doc, [mapping])
         self.assertEqual(result["withDefault"], "fallback")
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_multiple_mappings(self, mock_frappe):
+    def test_multiple_mappings(self):
         """Multiple mappings produce a complete payload."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc(name="CUST-001", customer_name="Jane")
         mappings = [
             self._make_mapping(avro_field="id", avro_type="string", source_type="Field", source_field="name"),
@@ -145,11 +147,8 @@ class TestBuildPayload(unittest.TestCase):
         self.assertEqual(result["name"], "Jane")
         self.assertEqual(result["source"], "erpnext")
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_int_coercion(self, mock_frappe):
+    def test_int_coercion(self):
         """String value coerced to int when avro_type is int."""
-        from connect.services.mapping_service import build_payload
-
         doc = self._make_doc(amount="100")
         mapping = self._make_mapping(
             avro_field="amount",
@@ -161,6 +160,25 @@ class TestBuildPayload(unittest.TestCase):
         self.assertEqual(result["amount"], 100)
         self.assertIsInstance(result["amount"], int)
 
+    @patch("connect.services.mapping_service.frappe")
+    def test_compile_rule_reused_until_modified(self, mock_frappe):
+        """compile_rule caches the plan per rule until its modified timestamp changes."""
+        doc = self._make_doc(customer_name="Jane")
+        rule = SimpleNamespace(
+            name="RULE-1",
+            modified="2024-01-01 00:00:00",
+            field_mappings=[
+                self._make_mapping(avro_field="name", source_type="Field", source_field="customer_name")
+            ],
+        )
+        plan = compile_rule(rule)
+        self.assertIs(compile_rule(rule), plan)
+        self.assertEqual(build_payload_compiled(doc, plan), {"name": "Jane"})
+
+        rule.modified = "2024-01-02 00:00:00"
+        rule.field_mappings = [self._make_mapping(avro_field="source", source_type="Static", static_value="erpnext")]
+        self.assertEqual(build_payload_compiled(doc, compile_rule(rule)), {"source": "erpnext"})
+
 
 if __name__ == "__main__":
     unittest.main()
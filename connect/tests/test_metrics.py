@@ -0,0 +1,34 @@
+"""Tests for aggregated counters."""
+import unittest
+from unittest.mock import patch
+
+from connect.utils import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    """Test counting and periodic summary logging."""
+
+    def setUp(self):
+        metrics.flush()
+
+    def test_inc_accumulates_per_label_set(self):
+        metrics.inc("kafka.delivered", topic="a")
+        metrics.inc("kafka.delivered", topic="a")
+        metrics.inc("kafka.delivered", topic="b")
+        counts = metrics.snapshot()
+        self.assertEqual(counts[("kafka.delivered", ("topic", "a"))], 2)
+        self.assertEqual(counts[("kafka.delivered", ("topic", "b"))], 1)
+
+    @patch("connect.utils.metrics.log_info")
+    def test_flush_logs_once_per_counter_and_resets(self, mock_log_info):
+        for _ in range(100):
+            metrics.inc("kafka.consumed", topic="t")
+        metrics.flush()
+        mock_log_info.assert_called_once()
+        self.assertIn("count=100", mock_log_info.call_args.args[1])
+        self.assertEqual(metrics.snapshot(), {})
+
+    @patch("connect.utils.metrics.log_info")
+    def test_no_log_before_interval(self, mock_log_info):
+        metrics.inc("kafka.consumed", topic="t")
+        mock_log_info.assert_not_called()
@@ -6,10 +6,16 @@ Tests the full path: document event → rule matching → payload building
 import json
 import unittest
 from types import SimpleNamespace
-from unittest.mock import MagicMock, patch
 
 import fastavro
 
+from connect.kafka.serialization import (
+    MESSAGE_V1_SCHEMA_STR,
+    deserialize_inner_payload,
+    serialize_inner_payload,
+)
+from connect.services.mapping_service import build_payload
+
 
 class TestProduceFlow(unittest.TestCase):
     """End-to-end produce flow without real Kafka or DB."""
@@ -50,17 +56,17 @@ class TestProduceFlow(unittest.TestCase):
             default_value="",
         )
 
-        rule = MagicMock()
-        rule.rule_name = "Create Client"
-        rule.source_doctype = "Customer"
-        rule.document_event = "after_insert"
-        rule.command_type = "CreateClient"
-        rule.command_category = "client"
-        rule.avro_schema_name = "ClientCommandV1"
-        rule.priority = 0
-        rule.condition = ""
-        rule.field_mappings = [mapping1, mapping2, mapping3]
-        return rule
+        return SimpleNamespace(
+            rule_name="Create Client",
+            source_doctype="Customer",
+            document_event="after_insert",
+            command_type="CreateClient",
+            command_category="client",
+            avro_schema_name="ClientCommandV1",
+            priority=0,
+            condition="",
+            field_mappings=[mapping1, mapping2, mapping3],
+        )
 
     def _make_schema(self):
         """Return a test Avro schema for ClientCommandV1."""
@@ -77,11 +83,6 @@ class TestProduceFlow(unittest.TestCase):
 
     def test_inner_serialization_with_mapped_payload(self):
         """Map document fields → build Avro payload → serialize round-trip."""
-        from connect.kafka.serialization import (
-            deserialize_inner_payload,
-            serialize_inner_payload,
-        )
-
         schema = self._make_schema()
         payload = {
             "clientId": 42,
@@ -97,24 +98,15 @@ class TestProduceFlow(unittest.TestCase):
         self.assertEqual(result["firstname"], "John")
         self.assertEqual(result["lastname"], "Doe")
 
-    @patch("connect.services.mapping_service.frappe")
-    def test_mapping_to_serialization_flow(self, mock_frappe):
+    def test_mapping_to_serialization_flow(self):
         """Full flow: doc → mapping → serialization."""
-        from connect.kafka.serialization import (
-            deserialize_inner_payload,
-            serialize_inner_payload,
-        )
-        from connect.services.mapping_service import build_payload
-
-        # Create a mock document
-        doc = MagicMock()
-        doc.get = MagicMock(
-            side_effect=lambda k, default=None: {
-                "fineract_client_id": 42,
-                "first_name": "John",
-                "last_name": "Doe",
-            }.get(k, default)
-        )
+        # Create a fake document; build_payload only calls doc.get()
+        fields = {
+            "fineract_client_id": 42,
+            "first_name": "John",
+            "last_name": "Doe",
+        }
+        doc = SimpleNamespace(doctype="Customer", name="CUST-001", get=fields.get)
 
         rule = self._make_rule()
         schema = self._make_schema()
@@ -134,8 +126,6 @@ class TestProduceFlow(unittest.TestCase):
 
     def test_envelope_structure(self):
         """MessageV1 envelope has all required fields."""
-        from connect.kafka.serialization import MESSAGE_V1_SCHEMA_STR
-
         schema = json.loads(MESSAGE_V1_SCHEMA_STR)
         field_names = [f["name"] for f in schema["fields"]]
 
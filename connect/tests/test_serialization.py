@@ -1,13 +1,18 @@
 """Tests for the two-tier Avro serialization module."""
 import json
+import struct
 import unittest
 from io import BytesIO
 
 import fastavro
 
+from connect.kafka import serialization
 from connect.kafka.serialization import (
     MESSAGE_V1_SCHEMA_STR,
+    deserialize_envelope_with_schema,
     deserialize_inner_payload,
+    read_schema_id,
+    serialize_envelope_with_schema_id,
     serialize_inner_payload,
 )
 
@@ -88,6 +93,20 @@ class TestInnerPayloadSerialization(unittest.TestCase):
         with self.assertRaises(Exception):
             serialize_inner_payload(self.client_schema, bad_payload)
 
+    def test_schema_parsed_once_per_content(self):
+        """The same dict is found by identity; equal dicts share one parse, regardless of key order."""
+        from connect.kafka.serialization import _parse_canonical_schema, _parse_schema
+
+        serialization._PARSED_BY_ID.clear()
+        _parse_canonical_schema.cache_clear()
+        parsed = _parse_schema(self.client_schema)
+        self.assertEqual(serialization._PARSED_BY_ID, {id(self.client_schema): (self.client_schema, parsed)})
+        self.assertIs(_parse_schema(self.client_schema), parsed)
+
+        reordered = dict(reversed(list(self.client_schema.items())))
+        self.assertIs(_parse_schema(json.loads(json.dumps(reordered))), parsed)
+        self.assertEqual(_parse_canonical_schema.cache_info().misses, 1)
+
 
 class TestMessageV1Schema(unittest.TestCase):
     """Verify the MessageV1 envelope schema is valid Avro."""
@@ -117,5 +136,48 @@ class TestMessageV1Schema(unittest.TestCase):
         self.assertEqual(data_field["type"], "bytes")
 
 
+class TestEnvelopeWireFormat(unittest.TestCase):
+    """Test decoding Confluent wire format envelopes with fastavro."""
+
+    def setUp(self):
+        self.parsed = fastavro.parse_schema(json.loads(MESSAGE_V1_SCHEMA_STR))
+        self.envelope = {
+            "id": 0,
+            "source": "openerp-fineract",
+            "type": "CreateClient",
+            "category": "CLIENT",
+            "createdAt": "2024-01-01T00:00:00",
+            "businessDate": "2024-01-01",
+            "tenantId": "default",
+            "idempotencyKey": "abc123",
+            "dataschema": "ClientCommandV1",
+            "data": b"\x02\x04",
+        }
+
+    def _encode(self, schema_id):
+        buf = BytesIO()
+        buf.write(struct.pack(">bI", 0, schema_id))
+        fastavro.schemaless_writer(buf, self.parsed, self.envelope)
+        return buf.getvalue()
+
+    def test_read_schema_id(self):
+        self.assertEqual(read_schema_id(self._encode(42)), 42)
+
+    def test_read_schema_id_rejects_bad_magic(self):
+        with self.assertRaises(ValueError):
+            read_schema_id(b"\x01\x00\x00\x00\x2a")
+
+    def test_read_schema_id_rejects_short_message(self):
+        with self.assertRaises(ValueError):
+            read_schema_id(b"\x00\x00")
+
+    def test_envelope_round_trip(self):
+        result = deserialize_envelope_with_schema(self.parsed, self._encode(7))
+        self.assertEqual(result, self.envelope)
+
+    def test_serialize_matches_wire_format(self):
+        self.assertEqual(serialize_envelope_with_schema_id(7, self.envelope), self._encode(7))
+
+
 if __name__ == "__main__":
     unittest.main()
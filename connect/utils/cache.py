@@ -1,20 +1,24 @@
 """Redis cache helpers for schemas and settings."""
+import functools
+import hashlib
+import json
+
 import frappe
 
 
 def cache_get(key: str):
     """Get a value from Redis cache."""
-    return frappe.cache().get_value(key)
+    return frappe.cache.get_value(key)
 
 
 def cache_set(key: str, value, expires_in_sec: int = 300):
     """Set a value in Redis cache with TTL."""
-    frappe.cache().set_value(key, value, expires_in_sec=expires_in_sec)
+    frappe.cache.set_value(key, value, expires_in_sec=expires_in_sec)
 
 
 def cache_delete(key: str):
     """Delete a value from Redis cache."""
-    frappe.cache().delete_value(key)
+    frappe.cache.delete_value(key)
 
 
 def cache_get_or_set(key: str, generator, expires_in_sec: int = 300):
@@ -26,3 +30,25 @@ def cache_get_or_set(key: str, generator, expires_in_sec: int = 300):
     if value is not None:
         cache_set(key, value, expires_in_sec=expires_in_sec)
     return value
+
+
+def cached(key: str, ttl: int = 300):
+    """Cache a function's return value in Redis for `ttl` seconds.
+
+    Calls without arguments are stored under `key` itself, so they can be
+    invalidated with `cache_delete(key)`. Otherwise a blake2b digest of the
+    arguments is appended to the key.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache_key = key
+            if args or kwargs:
+                serialized = json.dumps([args, kwargs], sort_keys=True, default=str)
+                cache_key = f"{key}:{hashlib.blake2b(serialized.encode(), digest_size=16).hexdigest()}"
+            return cache_get_or_set(cache_key, lambda: fn(*args, **kwargs), expires_in_sec=ttl)
+
+        return wrapper
+
+    return decorator
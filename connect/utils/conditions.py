@@ -0,0 +1,39 @@
+"""Compiled, sandboxed evaluation of rule and handler conditions.
+
+Equivalent to `frappe.safe_eval`, except that the restricted bytecode is
+compiled once per expression and reused. Conditions are evaluated for every
+matching document event and every consumed message, so recompiling the same
+string each time is wasted work.
+"""
+from functools import lru_cache
+
+import frappe
+
+
+@lru_cache(maxsize=512)
+def compile_condition(expression: str):
+    """Compile a condition expression with Frappe's safe_eval restrictions.
+
+    Keyed by the expression text, so editing a rule or handler simply
+    produces a new cache entry and no invalidation is required.
+
+    Raises:
+        SyntaxError: If the expression is invalid or uses restricted syntax.
+    """
+    from frappe.utils.safe_exec import FrappeTransformer, _validate_safe_eval_syntax
+    from RestrictedPython import compile_restricted
+
+    if "__" in expression:
+        raise SyntaxError("Illegal rule {}. Cannot use '__'".format(frappe.bold(expression)))
+
+    _validate_safe_eval_syntax(expression)
+    return compile_restricted(expression, filename="<safe_eval>", policy=FrappeTransformer, mode="eval")
+
+
+def evaluate_condition(expression: str, eval_globals: dict):
+    """Evaluate a condition expression in the safe_eval sandbox."""
+    from frappe.utils.safe_exec import WHITELISTED_SAFE_EVAL_GLOBALS
+
+    code = compile_condition(expression)
+    eval_globals = {**eval_globals, "__builtins__": {}, **WHITELISTED_SAFE_EVAL_GLOBALS}
+    return eval(code, eval_globals)
@@ -0,0 +1,11 @@
+"""Database helpers not covered by frappe.db's public API."""
+import frappe
+
+
+def affected_rows() -> int:
+    """Return the affected-row count of the last statement run through frappe.db.sql.
+
+    frappe.db does not expose this publicly, so it is read from the
+    underlying cursor here and nowhere else.
+    """
+    return frappe.db._cursor.rowcount
@@ -0,0 +1,39 @@
+"""Per-process cache of ERPNext defaults used when creating synced records."""
+import time
+
+import frappe
+
+from connect.connect.doctype.fineract_kafka_settings.fineract_kafka_settings import FineractKafkaSettings
+
+SELLING_DEFAULT_FALLBACKS = {
+    "customer_group": "Individual",
+    "territory": "All Territories",
+}
+
+# Process-local Selling Settings defaults.
+# Maps (site, fieldname) -> (expires_at, value).
+_SELLING_DEFAULTS: dict[tuple[str, str], tuple[float, str]] = {}
+
+
+def get_selling_default(fieldname: str) -> str:
+    """Return a Selling Settings default, falling back to a sensible value.
+
+    Cached per site for LOCAL_CACHE_TTL seconds, so a save handled by another
+    worker is picked up without a restart.
+    """
+    key = (frappe.local.site, fieldname)
+    cached = _SELLING_DEFAULTS.get(key)
+    now = time.monotonic()
+    if cached and cached[0] > now:
+        return cached[1]
+
+    value = frappe.db.get_single_value("Selling Settings", fieldname) or SELLING_DEFAULT_FALLBACKS[fieldname]
+    _SELLING_DEFAULTS[key] = (now + FineractKafkaSettings.LOCAL_CACHE_TTL, value)
+    return value
+
+
+def clear_selling_defaults(doc=None, method=None):
+    """doc_events hook: drop this site's cached defaults when Selling Settings is saved."""
+    site = frappe.local.site
+    for key in [key for key in _SELLING_DEFAULTS if key[0] == site]:
+        _SELLING_DEFAULTS.pop(key, None)
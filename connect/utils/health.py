@@ -1,39 +1,72 @@
 """Health check utilities for Kafka and Schema Registry."""
-import frappe
+from concurrent.futures import ThreadPoolExecutor
 
+from connect.connect.doctype.fineract_kafka_settings.fineract_kafka_settings import FineractKafkaSettings
 from connect.utils.logging import log_error, log_info
 
+# Imported once here rather than per check; a missing client library only
+# fails the checks, not every module that imports this one.
+try:
+    from confluent_kafka.admin import AdminClient
+    from confluent_kafka.schema_registry import SchemaRegistryClient
+except ImportError:
+    AdminClient = SchemaRegistryClient = None
 
-def check_kafka_health(config: dict) -> dict:
+# Clients reused across health checks, keyed by their config. Building one
+# starts a librdkafka instance or HTTP session, so probes share them.
+_ADMIN_CLIENTS: dict[tuple, "AdminClient"] = {}
+_SR_CLIENTS: dict[tuple, "SchemaRegistryClient"] = {}
+
+# Seconds to wait for the broker when settings do not say otherwise
+HEALTH_CHECK_TIMEOUT = 3
+
+
+def check_kafka_health(config: dict, log_errors: bool = True, timeout: float = HEALTH_CHECK_TIMEOUT) -> dict:
     """Check if Kafka brokers are reachable.
 
-    Returns dict with 'status' ('ok'/'error') and 'detail'.
+    Uses DescribeCluster, which returns only the broker list, rather than
+    fetching metadata for every topic in the cluster.
+
+    Returns dict with 'status' ('ok'/'error') and 'detail'. Pass
+    `log_errors=False` when calling from a thread without a Frappe site.
     """
-    try:
-        from confluent_kafka.admin import AdminClient
+    if AdminClient is None:
+        return {"status": "error", "detail": "confluent_kafka is not installed"}
 
-        admin = AdminClient(config)
-        metadata = admin.list_topics(timeout=10)
-        brokers = list(metadata.brokers.values())
+    key = _config_key(config)
+    try:
+        admin = _ADMIN_CLIENTS.get(key)
+        if admin is None:
+            admin = _ADMIN_CLIENTS[key] = AdminClient(config)
+        cluster = admin.describe_cluster(request_timeout=timeout).result(timeout=timeout)
+        brokers = cluster.nodes
         return {
             "status": "ok",
             "detail": f"{len(brokers)} broker(s) available",
             "brokers": [f"{b.host}:{b.port}" for b in brokers],
         }
     except Exception as e:
-        log_error("Kafka health check failed", str(e), exc=e)
+        # Start from a fresh client on the next probe
+        _ADMIN_CLIENTS.pop(key, None)
+        if log_errors:
+            log_error("Kafka health check failed", str(e), exc=e)
         return {"status": "error", "detail": str(e)}
 
 
-def check_schema_registry_health(config: dict) -> dict:
+def check_schema_registry_health(config: dict, log_errors: bool = True) -> dict:
     """Check if Schema Registry is reachable.
 
-    Returns dict with 'status' ('ok'/'error') and 'detail'.
+    Returns dict with 'status' ('ok'/'error') and 'detail'. Pass
+    `log_errors=False` when calling from a thread without a Frappe site.
     """
-    try:
-        from confluent_kafka.schema_registry import SchemaRegistryClient
+    if SchemaRegistryClient is None:
+        return {"status": "error", "detail": "confluent_kafka is not installed"}
 
-        client = SchemaRegistryClient(config)
+    key = _config_key(config)
+    try:
+        client = _SR_CLIENTS.get(key)
+        if client is None:
+            client = _SR_CLIENTS[key] = SchemaRegistryClient(config)
         # Listing subjects is a lightweight health check
         subjects = client.get_subjects()
         return {
@@ -42,17 +75,25 @@ def check_schema_registry_health(config: dict) -> dict:
             "subjects": subjects,
         }
     except Exception as e:
-        log_error("Schema Registry health check failed", str(e), exc=e)
+        _SR_CLIENTS.pop(key, None)
+        if log_errors:
+            log_error("Schema Registry health check failed", str(e), exc=e)
         return {"status": "error", "detail": str(e)}
 
 
+def _config_key(config: dict) -> tuple:
+    return tuple(sorted(config.items()))
+
+
 def check_full_health() -> dict:
     """Run all health checks using current settings.
 
     Returns dict with overall status and individual component results.
     """
     try:
-        settings = frappe.get_single("Fineract Kafka Settings")
+        # Served from the process-local and Redis copies, so frequent
+        # probes do not read the Single from the database
+        settings = FineractKafkaSettings.get_settings()
     except Exception as e:
         return {
             "status": "error",
@@ -61,17 +102,26 @@ def check_full_health() -> dict:
             "schema_registry": {"status": "unknown"},
         }
 
-    kafka_config = {
-        "bootstrap.servers": settings.kafka_bootstrap_servers,
-    }
-    # Apply security config
-    if hasattr(settings, "_apply_security_config"):
-        settings._apply_security_config(kafka_config)
-
+    # Both configs are built once per cached settings instance
+    kafka_config = settings.get_admin_config()
     sr_config = settings.get_schema_registry_config()
 
-    kafka_result = check_kafka_health(kafka_config)
-    sr_result = check_schema_registry_health(sr_config)
+    # Both checks are network round-trips, so run them side by side. Worker
+    # threads have no Frappe site, so failures are logged from this thread.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        kafka_future = pool.submit(
+            check_kafka_health,
+            kafka_config,
+            log_errors=False,
+            timeout=settings.health_check_timeout_seconds or HEALTH_CHECK_TIMEOUT,
+        )
+        sr_future = pool.submit(check_schema_registry_health, sr_config, log_errors=False)
+        kafka_result = kafka_future.result()
+        sr_result = sr_future.result()
+
+    for title, result in (("Kafka", kafka_result), ("Schema Registry", sr_result)):
+        if result["status"] != "ok":
+            log_error(f"{title} health check failed", str(result.get("detail")))
 
     overall = "ok" if kafka_result["status"] == "ok" and sr_result["status"] == "ok" else "error"
 
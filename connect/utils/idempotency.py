@@ -4,6 +4,9 @@ import uuid
 
 import frappe
 
+# Log statuses after which a message must not be produced/processed again
+COMPLETED_STATUSES = ("Delivered", "Processed", "Skipped")
+
 
 def generate_idempotency_key(
     doctype: str,
@@ -14,12 +17,13 @@ def generate_idempotency_key(
 ) -> str:
     """Generate a deterministic idempotency key for a producer message.
 
-    The key is a SHA-256 hash of the document identity + event + rule,
+    The key is a 128-bit BLAKE2b hash of the document identity + event + rule,
     ensuring the same document event with the same rule always produces
-    the same key (preventing duplicates).
+    the same key (preventing duplicates). It is only used for deduplication,
+    so a cheaper non-SHA-2 digest is sufficient.
     """
     raw = f"{doctype}:{docname}:{event}:{command_type}:{rule_name}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+    return _hash_key(raw)
 
 
 def generate_consumer_idempotency_key(
@@ -32,7 +36,12 @@ def generate_consumer_idempotency_key(
     Based on topic/partition/offset which is unique per message.
     """
     raw = f"{topic}:{partition}:{offset}"
-    return hashlib.sha256(raw.encode()).hexdigest()
+    return _hash_key(raw)
+
+
+def _hash_key(raw: str) -> str:
+    """Return the 32-char hex BLAKE2b-128 digest of `raw`."""
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
 
 
 def check_idempotency(idempotency_key: str) -> bool:
@@ -44,7 +53,7 @@ def check_idempotency(idempotency_key: str) -> bool:
         "Fineract Kafka Log",
         {
             "idempotency_key": idempotency_key,
-            "status": ("in", ["Delivered", "Processed", "Skipped"]),
+            "status": ("in", list(COMPLETED_STATUSES)),
         },
     )
     return bool(exists)
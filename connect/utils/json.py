@@ -0,0 +1,27 @@
+"""JSON helpers backed by orjson.
+
+Drop-in replacements for the `json.loads`/`json.dumps` calls on hot paths.
+`dumps` returns `str` so call sites storing JSON in text fields or Redis
+stay unchanged.
+"""
+import orjson
+
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def loads(data: str | bytes):
+    """Parse a JSON document from str or bytes."""
+    return orjson.loads(data)
+
+
+def dumps(obj, default=None, indent: bool = False) -> str:
+    """Serialize `obj` to a JSON string.
+
+    Args:
+        default: Callable for types orjson cannot serialize natively (e.g. `str`).
+        indent: Pretty-print with two-space indentation.
+    """
+    option = orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=default, option=option).decode()
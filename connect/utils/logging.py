@@ -1,11 +1,19 @@
 """Structured logging for Kafka operations."""
 import logging
+import time
 import traceback
 
 import frappe
 
 logger = logging.getLogger("connect")
 
+# Seconds during which a repeated error is only sent to the logger
+ERROR_LOG_INTERVAL = 60.0
+
+# Last Error Log write per (title, message), bounded to _ERROR_LOG_KEYS_MAX keys
+_last_error_log: dict[tuple[str, str], float] = {}
+_ERROR_LOG_KEYS_MAX = 1024
+
 
 def log_info(
     title: str,
@@ -24,17 +32,40 @@ def log_error(
     reference_doctype: str | None = None,
     reference_name: str | None = None,
 ):
-    """Record an error to both the logger and frappe error log."""
+    """Record an error to both the logger and frappe error log.
+
+    The logger line is always written; the Error Log row is written at most
+    once per ERROR_LOG_INTERVAL seconds for the same title and message, so a
+    persistent failure (e.g. an unreachable broker) does not insert a row on
+    every attempt.
+    """
+    # The logger formats the traceback only if a handler emits the record
+    logger.error("%s - %s", title, message, exc_info=exc)
+    if not _should_write_error_log(title, message):
+        return
+
     if exc:
-        tb = traceback.format_exc()
-        logger.error("%s - %s\n%s", title, message, tb)
-        try:
-            frappe.log_error(tb, title)
-        except Exception:
-            pass  # Don't fail if frappe is not initialized
-    else:
-        logger.error("%s - %s", title, message)
-        try:
-            frappe.log_error(message, title)
-        except Exception:
-            pass
+        message = "".join(traceback.format_exception(exc))
+    try:
+        frappe.log_error(
+            title=title,
+            message=message,
+            reference_doctype=reference_doctype,
+            reference_name=reference_name,
+        )
+    except Exception:
+        pass  # Don't fail if frappe is not initialized
+
+
+def _should_write_error_log(title: str, message: str) -> bool:
+    """Return True if no Error Log row was written for this error recently."""
+    key = (title, message)
+    now = time.monotonic()
+    last = _last_error_log.get(key)
+    if last is not None and now - last < ERROR_LOG_INTERVAL:
+        return False
+
+    if len(_last_error_log) >= _ERROR_LOG_KEYS_MAX:
+        _last_error_log.clear()
+    _last_error_log[key] = now
+    return True
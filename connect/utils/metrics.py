@@ -0,0 +1,47 @@
+"""Aggregated counters for per-message events.
+
+Per-message log lines on the produce/consume paths cost more than the work
+they describe. Hot paths count events here instead, and a single summary line
+per counter is logged at most once every FLUSH_INTERVAL seconds.
+"""
+import threading
+import time
+
+from connect.utils.logging import log_info
+
+# Seconds between summary log lines
+FLUSH_INTERVAL = 60.0
+
+_counts: dict[tuple, int] = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def inc(name: str, amount: int = 1, **labels):
+    """Increment counter `name` for the given labels, e.g. `inc("kafka.produced", topic=t)`."""
+    key = (name, *sorted(labels.items()))
+    with _lock:
+        _counts[key] = _counts.get(key, 0) + amount
+    if time.monotonic() - _last_flush >= FLUSH_INTERVAL:
+        flush()
+
+
+def flush():
+    """Log one summary line per counter accumulated since the last flush and reset."""
+    global _last_flush
+
+    with _lock:
+        counts = dict(_counts)
+        _counts.clear()
+        elapsed = time.monotonic() - _last_flush
+        _last_flush = time.monotonic()
+
+    for (name, *labels), count in counts.items():
+        parts = [f"count={count}", *(f"{k}={v}" for k, v in labels), f"interval={elapsed:.0f}s"]
+        log_info(f"Metric {name}", " ".join(parts))
+
+
+def snapshot() -> dict[tuple, int]:
+    """Return a copy of the counts accumulated since the last flush."""
+    with _lock:
+        return dict(_counts)
@@ -6,11 +6,14 @@ from connect.utils.errors import ERROR_CODES
 
 def require_fields(payload: dict, fields: list[str]):
     """Raise a validation error if any required fields are missing or falsy."""
-    missing = [f for f in fields if not payload.get(f)]
-    if missing:
-        frappe.throw(
-            f"{ERROR_CODES['VALIDATION_ERROR']}: missing fields: {', '.join(missing)}"
-        )
+    get = payload.get
+    if all(get(f) for f in fields):
+        return
+
+    missing = [f for f in fields if not get(f)]
+    frappe.throw(
+        f"{ERROR_CODES['VALIDATION_ERROR']}: missing fields: {', '.join(missing)}"
+    )
 
 
 def validate_avro_field_value(value, avro_type: str, is_nullable: bool = False):
@@ -23,36 +26,61 @@ def validate_avro_field_value(value, avro_type: str, is_nullable: bool = False):
             return None
         raise ValueError(f"Value is None but field is not nullable (type={avro_type})")
 
-    type_map = {
-        "string": str,
-        "int": int,
-        "long": int,
-        "boolean": bool,
-        "bytes": bytes,
-    }
+    # Values already of the exact Python type skip the coercer call
+    if type(value) is _EXACT_TYPES.get(avro_type):
+        return value
 
-    target_type = type_map.get(avro_type)
-    if target_type is None:
+    coercer = _COERCERS.get(avro_type)
+    if coercer is None:
         raise ValueError(f"Unknown Avro type: {avro_type}")
 
-    if isinstance(value, target_type):
-        return value
-
-    # Coercion
     try:
-        if avro_type in ("int", "long"):
-            return int(value)
-        elif avro_type == "boolean":
-            if isinstance(value, str):
-                return value.lower() in ("true", "1", "yes")
-            return bool(value)
-        elif avro_type == "string":
-            return str(value)
-        elif avro_type == "bytes":
-            if isinstance(value, str):
-                return value.encode("utf-8")
-            return bytes(value)
+        return coercer(value)
     except (ValueError, TypeError) as e:
         raise ValueError(f"Cannot coerce {type(value).__name__} to {avro_type}: {e}")
 
-    return value
+
+# Truthy strings, including the usual casings so most values skip lower()
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "True", "TRUE", "Yes", "YES"))
+
+
+def _to_int(value):
+    return value if isinstance(value, int) else int(value)
+
+
+def _to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value in _TRUE_STRINGS or value.lower() in _TRUE_STRINGS
+    return bool(value)
+
+
+def _to_string(value):
+    return value if isinstance(value, str) else str(value)
+
+
+def _to_bytes(value):
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return bytes(value)
+
+
+_EXACT_TYPES = {
+    "string": str,
+    "int": int,
+    "long": int,
+    "boolean": bool,
+    "bytes": bytes,
+}
+
+# Coercion per Avro type; values already of the target type pass through
+_COERCERS = {
+    "string": _to_string,
+    "int": _to_int,
+    "long": _to_int,
+    "boolean": _to_boolean,
+    "bytes": _to_bytes,
+}